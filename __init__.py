@@ -2,3 +2,5 @@ from .polynomial import polynomial
 from .factorizer import factorizer
 from .matrix import matrix, det, adjoint, transpose, isSquare
 from .rational import rational
+from .frozen import frozenPolynomial
+from .lazy import lazyPolynomial
@@ -0,0 +1,2 @@
+from .cases import case, cases
+from .runner import compare, load, measure, run, save
@@ -0,0 +1,28 @@
+import sys
+from argparse import ArgumentParser
+from .runner import compare, load, run, save
+
+def main(args = None):
+	parser = ArgumentParser(description = "Time the library's hot paths and compare the results against a baseline")
+	parser.add_argument("-k", "--pattern", help = "only run cases whose names match this regular expression")
+	parser.add_argument("-q", "--quick", action = "store_true", help = "only run the small sizes of each case")
+	parser.add_argument("-r", "--repeat", type = int, default = 5, help = "repeats per size (default 5)")
+	parser.add_argument("-o", "--output", help = "write the results to this JSON file")
+	parser.add_argument("-b", "--baseline", help = "compare the results against this JSON file")
+	parser.add_argument("-t", "--tolerance", type = float, default = 0.1, help = "allowed slowdown before a case is a regression (default 0.1)")
+	args = parser.parse_args(args)
+	results = run(pattern = args.pattern, quick = args.quick, repeat = args.repeat, log = sys.stdout)
+	if (args.output is not None):
+		save(results, args.output)
+	if (args.baseline is None):
+		return 0
+	comparison = compare(results, load(args.baseline), tolerance = args.tolerance)
+	print()
+	for key, old, new, ratio, status in comparison:
+		print(f"{key:32} {old * 1e6:14.2f} us {new * 1e6:14.2f} us {ratio:8.2f}x  {status}")
+	regressions = sum(1 for c in comparison if (c[4] == 'regression'))
+	print(f"\n{regressions} regression(s) beyond {args.tolerance:.0%}")
+	return 1 if (regressions > 0) else 0
+
+if (__name__ == "__main__"):
+	sys.exit(main())
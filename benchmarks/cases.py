@@ -0,0 +1,175 @@
+from math import gcd
+from random import Random
+from ..factorizer import factorizer
+from ..matrix import matrix
+from ..polynomial import compiledExpressions, polynomial
+from ..rational import rational
+
+# Benchmark cases by name: (setup function, sizes, quick sizes)
+cases = {}
+
+# A prime modulus that keeps coefficients of modular benchmarks bounded
+prime = 998244353
+
+def case(sizes, quick):
+	"""
+
+	Register a benchmark case
+
+	The decorated function takes a size and returns a function of no
+	arguments that runs the operation being measured.  All inputs are built
+	before returning, so only the operation itself is timed
+
+	Parameters
+	----------
+	sizes : tuple
+		The sizes to run the case at
+	quick : tuple
+		The sizes to run the case at in a quick run
+
+	"""
+	def register(setup):
+		cases[setup.__name__] = (setup, sizes, quick)
+		return setup
+	return register
+
+def randomPolynomial(rng, n, bound = 1000):
+	return polynomial.fromDense([rng.randrange(-bound, bound) for i in range(n)])
+
+def randomMatrix(rng, n, bound = 100):
+	return matrix([[rng.randrange(-bound, bound) for j in range(n)] for i in range(n)])
+
+def randomRational(rng, bound = 1000):
+	# Never zero, so the values can be divided by
+	return rational(rng.choice((-1, 1)) * rng.randrange(1, bound), rng.randrange(1, bound))
+
+def randomNumbers(rng, bits, count):
+	return [rng.getrandbits(bits) | (1 << (bits - 1)) for i in range(count)]
+
+"""
+
+Polynomial cases
+
+"""
+
+@case((16, 64, 256, 1024), (16, 64))
+def polynomialMultiply(n):
+	rng = Random(n)
+	a = randomPolynomial(rng, n)
+	b = randomPolynomial(rng, n)
+	return lambda: a * b
+
+@case((16, 64, 256), (16, 64))
+def polynomialSparseMultiply(n):
+	rng = Random(n)
+	a = polynomial.fromDict({rng.randrange(10 ** 6): rng.randrange(1, 1000) for i in range(n)})
+	b = polynomial.fromDict({rng.randrange(10 ** 6): rng.randrange(1, 1000) for i in range(n)})
+	return lambda: a * b
+
+@case((8, 32, 128), (8, 32))
+def polynomialPower(n):
+	p = polynomial([1, 1], [1, 0])
+	return lambda: p ** n
+
+@case((8, 32, 128), (8, 32))
+def polynomialExpMod(n):
+	rng = Random(n)
+	p = polynomial([rng.randrange(prime) for i in range(n)], list(range(n)), nMod = prime)
+	m = polynomial([1] + [rng.randrange(prime) for i in range(n)], list(range(n, -1, -1)), nMod = prime)
+	return lambda: polynomial.expMod(p, 10 ** 9 + 7, m)
+
+@case((4, 16, 64), (4, 16))
+def polynomialFromString(n):
+	rng = Random(n)
+	s = " + ".join(f"{rng.randrange(1, 100)}x^{i}" for i in range(n))
+	def parse():
+		# Parsing the same string again would only hit the compile cache
+		compiledExpressions.clear()
+		polynomial.fromString(s)
+	return parse
+
+@case((16, 256, 4096), (16, 256))
+def polynomialCall(n):
+	rng = Random(n)
+	p = randomPolynomial(rng, n)
+	return lambda: p(0.999)
+
+"""
+
+Factorizer cases
+
+"""
+
+@case((32, 48, 64), (32,))
+def factorizerFactor(bits):
+	numbers = randomNumbers(Random(bits), bits, 8)
+	def factor():
+		# A fresh factorizer so that nothing is served from its memory
+		f = factorizer(memoryLimit = 0)
+		for n in numbers:
+			f.factor(n)
+	return factor
+
+@case((32, 48, 64), (32,))
+def factorizerEuPhi(bits):
+	numbers = randomNumbers(Random(bits), bits, 8)
+	def euPhi():
+		f = factorizer(memoryLimit = 0)
+		for n in numbers:
+			f.euPhi(n)
+	return euPhi
+
+@case((32, 48, 64), (32,))
+def factorizerOrd(bits):
+	rng = Random(bits)
+	m = randomNumbers(rng, bits, 1)[0] | 1
+	values = [a for a in randomNumbers(rng, bits - 1, 16) if gcd(a, m) == 1]
+	def ord():
+		f = factorizer(memoryLimit = 0)
+		for a in values:
+			f.ord(a, m)
+	return ord
+
+"""
+
+Matrix cases
+
+"""
+
+@case((8, 32, 128), (8, 32))
+def matrixMultiply(n):
+	rng = Random(n)
+	a = randomMatrix(rng, n)
+	b = randomMatrix(rng, n)
+	return lambda: a * b
+
+@case((8, 16, 32), (8, 16))
+def matrixDet(n):
+	a = randomMatrix(Random(n), n)
+	return lambda: a.det()
+
+@case((8, 16, 32), (8, 16))
+def matrixInv(n):
+	a = randomMatrix(Random(n), n)
+	return lambda: a.inv()
+
+"""
+
+Rational cases
+
+"""
+
+@case((64, 256, 1024), (64,))
+def rationalArithmetic(n):
+	rng = Random(n)
+	values = [randomRational(rng) for i in range(n)]
+	def arithmetic():
+		for a, b in zip(values, values[1:]):
+			a * b + a / b - b
+	return arithmetic
+
+@case((64, 256, 1024), (64,))
+def rationalSum(n):
+	rng = Random(n)
+	values = [randomRational(rng) for i in range(n)]
+	return lambda: rational.sum(values)
@@ -0,0 +1,140 @@
+import json
+import platform
+import re
+import sys
+from datetime import datetime, timezone
+from time import perf_counter
+from .cases import cases
+
+def measure(f, repeat = 5, minTime = 0.05):
+	"""
+
+	Time a function of no arguments
+
+	The number of calls per repeat is doubled until a repeat takes at least
+	minTime seconds, so fast operations are not lost in timer resolution
+
+	Parameters
+	----------
+	f : function
+		The function to time
+	repeat : int, default = 5
+		The number of repeats to take the best and mean of
+	minTime : float, default = 0.05
+		The minimum time of a repeat, in seconds
+
+	Return
+	------
+	A dictionary with the best and mean time per call, in seconds, and the
+	number of calls per repeat
+
+	"""
+	loops = 1
+	while (True):
+		start = perf_counter()
+		for i in range(loops):
+			f()
+		elapsed = perf_counter() - start
+		if (elapsed >= minTime):
+			break
+		loops *= 2
+	times = [elapsed / loops]
+	for r in range(repeat - 1):
+		start = perf_counter()
+		for i in range(loops):
+			f()
+		times.append((perf_counter() - start) / loops)
+	return {
+		'best': min(times),
+		'mean': sum(times) / len(times),
+		'loops': loops
+		}
+
+def run(pattern = None, quick = False, repeat = 5, minTime = 0.05, log = None):
+	"""
+
+	Run the benchmark cases
+
+	Parameters
+	----------
+	pattern : str, default = None
+		A regular expression.  If given, only the cases whose names contain a
+		match are run
+	quick : bool, default = False
+		Run every case at its small sizes only
+	repeat : int, default = 5
+		The number of repeats per size
+	minTime : float, default = 0.05
+		The minimum time of a repeat, in seconds
+	log : file, default = None
+		If given, each result is written here as soon as it is measured
+
+	Return
+	------
+	A dictionary describing the machine and the run, with the timings under
+	'results' keyed by "name/size"
+
+	"""
+	results = {}
+	for name, (setup, sizes, quickSizes) in cases.items():
+		if (pattern is not None and re.search(pattern, name) is None):
+			continue
+		for size in (quickSizes if quick else sizes):
+			key = f"{name}/{size}"
+			results[key] = measure(setup(size), repeat = repeat, minTime = minTime)
+			if (log is not None):
+				print(f"{key:32} {results[key]['best'] * 1e6:14.2f} us", file = log)
+	return {
+		'python': sys.version,
+		'implementation': platform.python_implementation(),
+		'platform': platform.platform(),
+		'time': datetime.now(timezone.utc).isoformat(),
+		'results': results
+		}
+
+def save(run, path):
+	with open(path, 'w') as f:
+		json.dump(run, f, indent = 1)
+
+def load(path):
+	with open(path) as f:
+		return json.load(f)
+
+def compare(run, baseline, tolerance = 0.1):
+	"""
+
+	Compare a run against a baseline run
+
+	Only the best times are compared, since they are the least affected by
+	other work on the machine
+
+	Parameters
+	----------
+	run : dict
+		A run as returned by run
+	baseline : dict
+		A run as returned by run, usually loaded from a file
+	tolerance : float, default = 0.1
+		The fraction by which a case may be slower than the baseline before
+		it counts as a regression
+
+	Return
+	------
+	A list of (key, baseline time, time, ratio, status) tuples for every
+	case in both runs, where status is 'regression', 'improvement' or 'ok'
+
+	"""
+	comparison = []
+	for key, result in run['results'].items():
+		if (key not in baseline['results']):
+			continue
+		old = baseline['results'][key]['best']
+		ratio = result['best'] / old
+		if (ratio > 1 + tolerance):
+			status = 'regression'
+		elif (ratio < 1 / (1 + tolerance)):
+			status = 'improvement'
+		else:
+			status = 'ok'
+		comparison.append((key, old, result['best'], ratio, status))
+	return comparison
@@ -0,0 +1,741 @@
+# Kernels for dense polynomials, stored as coefficient lists indexed by exponent
+
+from .memory import memory
+from .rational import rational
+
+# Below this many coefficients schoolbook multiplication beats Karatsuba
+karatsubaThreshold = 32
+# Polynomials whose terms fill at least this fraction of their exponent range
+# are multiplied densely
+denseThreshold = 0.25
+# Above this many coefficients integer products use the number-theoretic
+# transform instead of Karatsuba, provided the inputs are more than a third of
+# the transform length, which is padded up to a power of two.  The cost follows
+# the padded length: both take about a second at 8000 coefficients (length
+# 16384), and the transform is 1.5 times faster at 24000 (length 65536)
+nttThreshold = 8000
+# Divisions modulo a prime where both the quotient and the divisor have more
+# than this many coefficients use Newton iteration instead of long division.
+# Over the integers long division is always used, since the series inverse
+# has rational coefficients and Newton division was twice as slow
+newtonThreshold = 1024
+# The same, for a reducer whose series inverse is already computed
+reducerNewtonThreshold = 128
+# Multipoint evaluation switches to Horner's rule for this many points or fewer
+hornerLeafSize = 32
+# Primes of the form c * 2^k + 1 with a primitive root, for the number-theoretic
+# transform.  Each supports transforms of length up to 2^k
+nttPrimes = (
+	(2013265921, 31, 27),
+	(1811939329, 13, 26),
+	(469762049, 3, 26),
+	(2113929217, 5, 25),
+	(1711276033, 29, 25),
+	(1107296257, 10, 25),
+	(167772161, 3, 25),
+	(754974721, 11, 24),
+	(998244353, 3, 23)
+	)
+
+def add(a, b):
+	"""
+
+	Add two coefficient lists
+
+	"""
+	if (len(a) < len(b)):
+		a, b = b, a
+	r = a[:]
+	for i in range(0, len(b)):
+		r[i] += b[i]
+	return r
+
+def sub(a, b):
+	"""
+
+	Subtract the coefficient list b from the coefficient list a
+
+	"""
+	r = a[:] + [0] * (len(b) - len(a))
+	for i in range(0, len(b)):
+		r[i] -= b[i]
+	return r
+
+def addShifted(r, a, shift):
+	"""
+
+	Add the coefficient list a, multiplied by x^shift, into r in place
+
+	"""
+	for i in range(0, len(a)):
+		r[i + shift] += a[i]
+
+def schoolbook(a, b):
+	"""
+
+	Multiply two coefficient lists term by term
+
+	Parameters
+	----------
+	a : list
+		A non-empty list of coefficients, a[i] being the coefficient of x^i
+	b : list
+		A non-empty list of coefficients, b[i] being the coefficient of x^i
+
+	Return
+	------
+	The coefficient list of the product, of length len(a) + len(b) - 1
+
+	"""
+	if (len(a) < len(b)):
+		a, b = b, a
+	r = [0] * (len(a) + len(b) - 1)
+	for j in range(0, len(b)):
+		bj = b[j]
+		if (bj == 0):
+			continue
+		for i in range(0, len(a)):
+			r[i + j] += a[i] * bj
+	return r
+
+def karatsuba(a, b):
+	"""
+
+	Multiply two coefficient lists with Karatsuba's algorithm
+
+	Splits both inputs in half and recombines three half-sized products,
+	falling back to schoolbook multiplication below karatsubaThreshold.  The
+	cost is O(n^1.585) multiplications for inputs of length n
+
+	Parameters
+	----------
+	a : list
+		A non-empty list of coefficients, a[i] being the coefficient of x^i
+	b : list
+		A non-empty list of coefficients, b[i] being the coefficient of x^i
+
+	Return
+	------
+	The coefficient list of the product, of length len(a) + len(b) - 1
+
+	"""
+	if (len(a) < len(b)):
+		a, b = b, a
+	n = len(a)
+	m = len(b)
+	if (m <= karatsubaThreshold):
+		return schoolbook(a, b)
+	k = n // 2
+	r = [0] * (n + m - 1)
+	if (m <= k):
+		# b is too short to split, so only split a
+		addShifted(r, karatsuba(a[:k], b), 0)
+		addShifted(r, karatsuba(a[k:], b), k)
+		return r
+	a0, a1 = a[:k], a[k:]
+	b0, b1 = b[:k], b[k:]
+	low = karatsuba(a0, b0)
+	high = karatsuba(a1, b1)
+	mid = sub(sub(karatsuba(add(a0, a1), add(b0, b1)), low), high)
+	addShifted(r, low, 0)
+	addShifted(r, mid[:n + m - 1 - k], k)
+	addShifted(r, high, 2 * k)
+	return r
+
+def multiply(a, b, p = None, method = "auto"):
+	"""
+
+	Multiply two coefficient lists
+
+	Parameters
+	----------
+	a : list
+		A non-empty list of coefficients, a[i] being the coefficient of x^i
+	b : list
+		A non-empty list of coefficients, b[i] being the coefficient of x^i
+	p : int, default = None
+		If given, every coefficient of the product is reduced modulo p
+	method : str, default = "auto"
+		"schoolbook", "karatsuba", "ntt" or "auto".  Automatic selection
+		uses schoolbook multiplication for short inputs, the number-theoretic
+		transform for long integer inputs that fill enough of its padded
+		length and Karatsuba otherwise
+
+	Return
+	------
+	The coefficient list of the product
+
+	"""
+	if (method == "auto"):
+		n = min(len(a), len(b))
+		# The transform length: the product's length rounded up to a power of two
+		size = 1 << (len(a) + len(b) - 2).bit_length()
+		if (n <= karatsubaThreshold):
+			method = "schoolbook"
+		elif (n > nttThreshold and 3 * n > size and isIntegral(a) and isIntegral(b)):
+			method = "ntt"
+		else:
+			method = "karatsuba"
+	if (method == "schoolbook"):
+		r = schoolbook(a, b)
+	elif (method == "karatsuba"):
+		r = karatsuba(a, b)
+	elif (method == "ntt"):
+		if (not (isIntegral(a) and isIntegral(b))):
+			raise TypeError("The number-theoretic transform needs integer coefficients")
+		return nttMultiply(a, b, p)
+	else:
+		raise ValueError(f"Unknown multiplication method: {method}")
+	if (p is not None):
+		return [c % p for c in r]
+	return r
+
+def isIntegral(a):
+	"""
+
+	Check that every coefficient in a list is an integer
+
+	"""
+	return all(type(c) is int for c in a)
+
+def ntt(a, p, g, invert = False):
+	"""
+
+	Compute the number-theoretic transform of a list in place
+
+	Parameters
+	----------
+	a : list
+		A list of integers modulo p whose length is a power of 2 dividing
+		p - 1
+	p : int
+		A prime
+	g : int
+		A primitive root modulo p
+	invert : bool, default = False
+		Compute the inverse transform instead
+
+	"""
+	n = len(a)
+	# Put the entries in bit-reversed order
+	j = 0
+	for i in range(1, n):
+		bit = n >> 1
+		while (j & bit):
+			j ^= bit
+			bit >>= 1
+		j ^= bit
+		if (i < j):
+			a[i], a[j] = a[j], a[i]
+	length = 2
+	while (length <= n):
+		half = length // 2
+		w = pow(g, (p - 1) // length, p)
+		if (invert):
+			w = pow(w, p - 2, p)
+		roots = [1] * half
+		for k in range(1, half):
+			roots[k] = roots[k - 1] * w % p
+		for start in range(0, n, length):
+			mid = start + half
+			low = a[start:mid]
+			high = [x * r % p for x, r in zip(a[mid:start + length], roots)]
+			a[start:mid] = [(x + y) % p for x, y in zip(low, high)]
+			a[mid:start + length] = [(x - y) % p for x, y in zip(low, high)]
+		length *= 2
+	if (invert):
+		nInverse = pow(n, p - 2, p)
+		a[:] = [x * nInverse % p for x in a]
+
+def nttMultiply(a, b, p = None):
+	"""
+
+	Multiply two integer coefficient lists with the number-theoretic transform
+
+	The product is computed modulo as many NTT-friendly primes as are needed
+	to bound its coefficients and recombined with the Chinese remainder
+	theorem.  This takes O(n log n) operations per prime
+
+	Parameters
+	----------
+	a : list
+		A non-empty list of integer coefficients
+	b : list
+		A non-empty list of integer coefficients
+	p : int, default = None
+		If given, the coefficients are integers modulo p and the product is
+		reduced modulo p
+
+	Return
+	------
+	The coefficient list of the product
+
+	"""
+	n = len(a) + len(b) - 1
+	size = 1
+	while (size < n):
+		size *= 2
+	if (p is not None):
+		a = [c % p for c in a]
+		b = [c % p for c in b]
+	# Every coefficient of the product is at most this large in absolute value
+	bound = min(len(a), len(b)) * max(abs(c) for c in a) * max(abs(c) for c in b)
+	primes = []
+	modulus = 1
+	for q, g, k in nttPrimes:
+		if (size <= 2 ** k and q == p):
+			# The coefficient modulus is NTT-friendly itself, so one
+			# transform gives the answer directly
+			primes = [(q, g)]
+			modulus = q
+			bound = 0
+			break
+	for q, g, k in nttPrimes:
+		if (modulus > 2 * bound):
+			break
+		if (size <= 2 ** k):
+			primes.append((q, g))
+			modulus *= q
+	if (modulus <= 2 * bound):
+		# The coefficients are too big for the available primes
+		return multiply(a, b, p, "karatsuba")
+	r = None
+	m = 1
+	for q, g in primes:
+		fa = [c % q for c in a] + [0] * (size - len(a))
+		fb = [c % q for c in b] + [0] * (size - len(b))
+		ntt(fa, q, g)
+		ntt(fb, q, g)
+		fc = [x * y % q for x, y in zip(fa, fb)]
+		ntt(fc, q, g, True)
+		if (r is None):
+			r = fc[:n]
+		else:
+			# Garner's step: find the value modulo m * q matching both residues
+			mInverse = pow(m, -1, q)
+			r = [x + m * ((y - x) * mInverse % q) for x, y in zip(r, fc)]
+		m *= q
+	if (p is not None):
+		return [c % p for c in r]
+	# Move residues above m / 2 back to negative values
+	half = m // 2
+	return [x - m if (x > half) else x for x in r]
+
+def trim(a):
+	"""
+
+	Remove the trailing zero coefficients of a coefficient list in place
+
+	"""
+	while (len(a) > 0 and a[-1] == 0):
+		a.pop()
+	return a
+
+def divide(a, b):
+	"""
+
+	Divide one coefficient by another exactly
+
+	Integers that divide evenly stay integers, other integer quotients
+	become rationals and anything else uses true division
+
+	"""
+	if (type(a) is int and type(b) is int):
+		if (a % b == 0):
+			return a // b
+		return rational(a, b)
+	return a / b
+
+def longDivmod(a, b, p = None, inverse = None):
+	"""
+
+	Divide one coefficient list by another, one term at a time
+
+	Parameters
+	----------
+	a : list
+		The coefficients of the dividend
+	b : list
+		The coefficients of the divisor, with a non-zero last coefficient
+	p : int, default = None
+		If given, a prime modulus for every coefficient
+	inverse : int, default = None
+		The inverse of the leading coefficient of b modulo p, if already
+		known
+
+	Return
+	------
+	A tuple (q, r) of trimmed coefficient lists with a = q * b + r and r of
+	lower degree than b
+
+	"""
+	n = len(b)
+	lead = b[-1]
+	if (p is not None):
+		a = [c % p for c in a]
+		if (inverse is None):
+			inverse = pow(lead, -1, p)
+	else:
+		a = a[:]
+	trim(a)
+	if (len(a) < n):
+		return [], a
+	q = [0] * (len(a) - n + 1)
+	for i in range(len(a) - n, -1, -1):
+		c = a[i + n - 1]
+		if (c == 0):
+			continue
+		if (p is not None):
+			c = c * inverse % p
+			for j in range(0, n - 1):
+				a[i + j] = (a[i + j] - c * b[j]) % p
+		else:
+			c = divide(c, lead)
+			for j in range(0, n - 1):
+				a[i + j] -= c * b[j]
+		q[i] = c
+		a[i + n - 1] = 0
+	return trim(q), trim(a[:n - 1])
+
+def inverseSeries(f, n, p = None, g = None):
+	"""
+
+	Invert a power series with Newton iteration
+
+	Each step doubles the number of correct terms with g = g * (2 - f * g),
+	so the total cost is a constant number of multiplications of size n
+
+	Parameters
+	----------
+	f : list
+		The coefficients of the series, with an invertible constant term
+	n : int
+		The number of terms of the inverse to compute
+	p : int, default = None
+		If given, a prime modulus for every coefficient
+	g : list, default = None
+		Leading terms of the inverse that are already known, to continue from
+
+	Return
+	------
+	The first n coefficients of 1 / f
+
+	"""
+	if (g is None or len(g) == 0):
+		g = [pow(f[0], -1, p)] if (p is not None) else [divide(1, f[0])]
+	k = len(g)
+	while (k < n):
+		k = min(2 * k, n)
+		e = multiply(f[:k], g, p)[:k]
+		e = [-c for c in e]
+		e[0] += 2
+		g = multiply(g, e, p)[:k]
+		g += [0] * (k - len(g))
+	return g[:n]
+
+def newtonDivmod(a, b, p = None, inverse = None):
+	"""
+
+	Divide one coefficient list by another with Newton iteration
+
+	The quotient is the reversal of rev(a) / rev(b) truncated to the degree
+	difference, found with inverseSeries, and the remainder then needs a
+	single multiplication.  This costs O(M(n)), where M(n) is the cost of
+	multiplying polynomials of size n
+
+	Parameters
+	----------
+	a : list
+		The coefficients of the dividend
+	b : list
+		The coefficients of the divisor, with a non-zero last coefficient
+	p : int, default = None
+		If given, a prime modulus for every coefficient
+	inverse : list, default = None
+		Known leading terms of the power series inverse of reversed b
+
+	Return
+	------
+	A tuple (q, r) of trimmed coefficient lists with a = q * b + r and r of
+	lower degree than b
+
+	"""
+	if (p is not None):
+		a = trim([c % p for c in a])
+	else:
+		a = trim(a[:])
+	n = len(b) - 1
+	k = len(a) - n
+	if (k <= 0):
+		return [], a
+	inverse = inverseSeries(b[::-1], k, p, inverse)
+	q = multiply(a[::-1][:k], inverse, p)[:k]
+	q = (q + [0] * (k - len(q)))[::-1]
+	r = sub(a[:n], multiply(q, b, p)[:n])
+	if (p is not None):
+		r = [c % p for c in r]
+	return trim(q), trim(r)
+
+def fastDivmod(a, b, p = None):
+	"""
+
+	Divide one coefficient list by another with the fastest available method
+
+	Return
+	------
+	A tuple (q, r) of trimmed coefficient lists with a = q * b + r
+
+	"""
+	b = trim(b[:])
+	if (len(b) == 0):
+		raise ZeroDivisionError("Cannot divide by the zero polynomial")
+	if (p is not None and min(len(a) - len(b) + 1, len(b)) > newtonThreshold):
+		return newtonDivmod(a, b, p)
+	return longDivmod(a, b, p)
+
+def derivative(a, p = None):
+	"""
+
+	Differentiate a coefficient list
+
+	"""
+	r = [i * a[i] for i in range(1, len(a))]
+	if (p is not None):
+		r = [c % p for c in r]
+	return trim(r)
+
+def horner(a, x, p = None):
+	"""
+
+	Evaluate a coefficient list at a single point with Horner's rule
+
+	"""
+	t = 0
+	if (p is not None):
+		for i in range(len(a) - 1, -1, -1):
+			t = (t * x + a[i]) % p
+	else:
+		for i in range(len(a) - 1, -1, -1):
+			t = t * x + a[i]
+	return t
+
+def subproductTree(points, p = None):
+	"""
+
+	Build the subproduct tree of a list of points
+
+	Parameters
+	----------
+	points : list
+		A non-empty list of points
+	p : int, default = None
+		If given, a prime modulus for every coefficient
+
+	Return
+	------
+	A list of levels.  Level 0 holds the linear factors x - points[i] and node
+	i of level k is the product of the factors for the points with indices
+	from i * 2^k up to (but not including) (i + 1) * 2^k, so the last level
+	holds the product of every factor
+
+	"""
+	if (p is not None):
+		level = [[-x % p, 1] for x in points]
+	else:
+		level = [[-x, 1] for x in points]
+	tree = [level]
+	while (len(level) > 1):
+		level = [multiply(level[i], level[i + 1], p) if (i + 1 < len(level)) else level[i] for i in range(0, len(level), 2)]
+		tree.append(level)
+	return tree
+
+def evaluateMany(a, points, p = None, tree = None):
+	"""
+
+	Evaluate a coefficient list at many points with a remainder tree
+
+	The polynomial is reduced modulo the nodes of the subproduct tree from the
+	root down, so each point only sees a remainder of small degree.  With fast
+	division this takes O(M(n) log n) operations for n points and degree n
+
+	Parameters
+	----------
+	a : list
+		The coefficients of the polynomial
+	points : list
+		The points to evaluate at
+	p : int, default = None
+		If given, a prime modulus for every coefficient and point
+	tree : list, default = None
+		The subproduct tree of the points, if already built
+
+	Return
+	------
+	A list of the values of the polynomial at each point
+
+	"""
+	n = len(points)
+	if (n == 0):
+		return []
+	if (tree is None):
+		tree = subproductTree(points, p)
+	values = [0] * n
+
+	def descend(r, k, i):
+		low = i << k
+		high = min((i + 1) << k, n)
+		if (high - low <= hornerLeafSize):
+			for j in range(low, high):
+				values[j] = horner(r, points[j], p)
+			return
+		for child in (2 * i, 2 * i + 1):
+			if (child < len(tree[k - 1])):
+				descend(fastDivmod(r, tree[k - 1][child], p)[1], k - 1, child)
+
+	descend(fastDivmod(a, tree[-1][0], p)[1], len(tree) - 1, 0)
+	return values
+
+def interpolate(xs, ys, p = None):
+	"""
+
+	Find the polynomial of least degree through a set of points
+
+	Uses the subproduct tree of the xs: the weights y_i / M'(x_i), where M is
+	the product of every x - x_i, come from one multipoint evaluation and are
+	then combined up the tree.  This takes O(M(n) log n) operations
+
+	Parameters
+	----------
+	xs : list
+		Distinct points
+	ys : list
+		The values at those points
+	p : int, default = None
+		If given, a prime modulus for every coefficient and point
+
+	Return
+	------
+	The trimmed coefficient list of the interpolating polynomial
+
+	"""
+	if (len(xs) != len(ys)):
+		raise ValueError("There must be as many values as points")
+	if (len(xs) == 0):
+		return []
+	tree = subproductTree(xs, p)
+	d = evaluateMany(derivative(tree[-1][0], p), xs, p, tree)
+	if (any(c == 0 for c in d)):
+		raise ValueError("Interpolation points must be distinct")
+	if (p is not None):
+		level = [[y * pow(c, -1, p) % p] for y, c in zip(ys, d)]
+	else:
+		level = [[divide(y, c)] for y, c in zip(ys, d)]
+	# A node's polynomial is left * (right's factors) + right * (left's factors)
+	for k in range(1, len(tree)):
+		below = tree[k - 1]
+		level = [add(multiply(level[i], below[i + 1], p), multiply(level[i + 1], below[i], p)) if (i + 1 < len(level)) else level[i] for i in range(0, len(level), 2)]
+	r = level[0]
+	if (p is not None):
+		r = [c % p for c in r]
+	return trim(r)
+
+def power(a, k, p = None, modulus = None):
+	"""
+
+	Raise a coefficient list to a non-negative integer power by squaring
+
+	Parameters
+	----------
+	a : list
+		The coefficients of the base
+	k : int
+		A non-negative integer
+	p : int, default = None
+		If given, a modulus for every coefficient
+	modulus : reducer, default = None
+		If given, the polynomial modulus to reduce by after every product
+
+	Return
+	------
+	The coefficient list of a^k, reduced by p and modulus
+
+	"""
+	r = [1]
+	if (modulus is not None):
+		a = modulus.reduce(a)
+	while (k > 0):
+		if (k & 1):
+			r = multiply(r, a, p)
+			if (modulus is not None):
+				r = modulus.reduce(r)
+		k >>= 1
+		if (k > 0):
+			a = multiply(a, a, p)
+			if (modulus is not None):
+				a = modulus.reduce(a)
+	return r
+
+class reducer:
+
+	def __init__(self, m, p = None):
+		"""
+
+		Prepare to divide many coefficient lists by the same modulus
+
+		Everything that only depends on the modulus is computed once: the
+		inverse of its leading coefficient modulo p and, as larger dividends
+		arrive, the power series inverse of the reversed modulus used for
+		Newton division modulo p
+
+		Parameters
+		----------
+		m : list
+			The coefficients of the modulus
+		p : int, default = None
+			If given, a prime modulus for every coefficient
+
+		"""
+		self.m = trim(m[:])
+		if (len(self.m) == 0):
+			raise ZeroDivisionError("Cannot divide by the zero polynomial")
+		self.p = p
+		self.inverse = None
+		if (p is not None):
+			self.m = trim([c % p for c in self.m])
+			if (len(self.m) == 0):
+				raise ZeroDivisionError("Cannot divide by the zero polynomial")
+			self.inverse = pow(self.m[-1], -1, p)
+		# The terms of 1 / reversed(m) computed so far
+		self.series = []
+
+	def divmod(self, a):
+		# Return the quotient and remainder of a divided by the modulus
+		k = len(a) - len(self.m) + 1
+		if (self.p is not None and min(k, len(self.m)) > reducerNewtonThreshold):
+			if (len(self.series) < k):
+				self.series = inverseSeries(self.m[::-1], k, self.p, self.series)
+			return newtonDivmod(a, self.m, self.p, self.series)
+		return longDivmod(a, self.m, self.p, self.inverse)
+
+	def reduce(self, a):
+		# Return the remainder of a divided by the modulus
+		if (self.p is None and len(a) < len(self.m)):
+			return trim(a[:])
+		return self.divmod(a)[1]
+
+def getReducer(m, p = None):
+	"""
+
+	Get a reducer for the modulus m, reusing a recent one if possible
+
+	"""
+	key = (tuple(m), p)
+	try:
+		return reducers[key]
+	except KeyError:
+		r = reducer(m, p)
+		reducers[key] = r
+		return r
+
+# The most recently used reducers, keyed by modulus and coefficient modulus
+reducers = memory({}, memoryLimit = 32)
@@ -1,5 +1,22 @@
-from math import log, sqrt
+from array import array
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from math import gcd, isqrt, lcm, log
+from os import cpu_count
+from random import randrange
 from .memory import memory
+from .store import store as diskStore
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+# The primes below 1000, used for trial division before the heavier methods
+smallPrimes = tuple(p for p in range(2, 1000) if all(p % q for q in range(2, isqrt(p) + 1)))
+# Miller-Rabin with these bases is deterministic for n < 3.3 * 10^24
+millerRabinBases = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
 
 class factorizer:
 	
@@ -11,17 +28,32 @@ class factorizer:
 	----------
 	memoryLimit : int, default = 50
 		The number of factorizations to keep in memory for recall
+	sieveLimit : int, default = 0
+		If positive, precompute a smallest-prime-factor table for every
+		integer up to sieveLimit so that those numbers factor in O(log n)
+	store : str or store, default = None
+		The path of an SQLite database (or a store object) that keeps every
+		factorization permanently.  Numbers missing from the memory are
+		looked up there before being factored, and new factorizations are
+		added to it, so several processes and later runs can share the work
 	
 	"""
-	def __init__(self, memoryLimit = 50):
+	def __init__(self, memoryLimit = 50, sieveLimit = 0, store = None):
+		if (isinstance(store, str)):
+			store = diskStore(store)
 		# A memory object of the last [memoryLimit] factored numbers and their factors
-		self.memory = memory({}, memoryLimit = memoryLimit)
+		self.memory = memory({}, memoryLimit = memoryLimit, store = store)
 		# The maximum allowed number of factorizations to remember
 		self.memoryLimit = memoryLimit
 		# The last number factored
 		self.last = 0
 		# The factors of the last number factored
 		self.factors = []
+		# The smallest prime factor of every integer up to sieveLimit
+		self.sieve = None
+		self.sieveLimit = 0
+		if (sieveLimit > 0):
+			self.buildSieve(sieveLimit)
 	
 	def addMemory(self):
 		"""
@@ -35,6 +67,61 @@ class factorizer:
 		"""
 		self.memory[self.last] = self.factors
 	
+	def buildSieve(self, N):
+		"""
+		
+		Precompute the smallest prime factor of every integer up to N
+		
+		The table is stored compactly in an unsigned int array.  Once built,
+		factor (and everything that uses it) runs in O(log n) for n <= N while
+		larger numbers still use trial division
+		
+		Parameters
+		----------
+		N : int
+			A positive integer, the largest number covered by the table
+		
+		"""
+		N = factorizer.check(N)
+		spf = array('I', range(0, N + 1))
+		isComposite = bytearray(isqrt(N) + 1)
+		primes = []
+		for p in range(2, isqrt(N) + 1):
+			if (not isComposite[p]):
+				primes.append(p)
+				isComposite[p * p::p] = b'\x01' * len(range(p * p, len(isComposite), p))
+		# Write larger primes first so that smaller primes overwrite them
+		for p in reversed(primes):
+			spf[p * p::p] = array('I', [p]) * len(range(p * p, N + 1, p))
+		self.sieve = spf
+		self.sieveLimit = N
+	
+	def sieveFactor(self, n):
+		"""
+		
+		An internal function to factor n using the smallest-prime-factor table
+		
+		Parameters
+		----------
+		n : int
+			A positive integer no larger than sieveLimit
+		
+		Return
+		------
+		A list of [p, a] pairs in the same form as factor
+		
+		"""
+		spf = self.sieve
+		factors = []
+		while (n > 1):
+			p = spf[n]
+			a = 0
+			while (spf[n] == p and n > 1):
+				n //= p
+				a += 1
+			factors.append([p, a])
+		return factors
+	
 	def clearMemory(self):
 		"""
 		
@@ -43,7 +130,21 @@ class factorizer:
 		Clear the memory of the object (just in case)
 		
 		"""
-		self.memories.clear()
+		self.memory.clear()
+	
+	def memoryStats(self):
+		"""
+		
+		Report the hit, miss and eviction counts of the factorizer's memory
+		
+		Useful for choosing a memoryLimit that fits a workload
+		
+		Return
+		------
+		A dictionary as returned by memory.stats
+		
+		"""
+		return self.memory.stats()
 	
 	def factor(self, n):
 		"""
@@ -64,31 +165,237 @@ class factorizer:
 		orders of n
 		
 		"""
+		n = factorizer.check(n)
 		if (n != self.last):
 			self.last = n
+			if (self.sieve is not None and n <= self.sieveLimit):
+				self.factors = self.sieveFactor(n)
+				return self.factors
 			try:
-				return self.memory[n]
+				self.factors = self.memory[n]
+				return self.factors
 			except KeyError:
 				c = n
-				k = 2
 				factors = []
-				while (k <= sqrt(c)):
-					if (c % k == 0):
-						factors.append(k)
-						c = c // k
-					else:
-						k += 1
+				# Strip small factors by trial division first
+				for p in smallPrimes:
+					if (p * p > c):
+						break
+					while (c % p == 0):
+						factors.append(p)
+						c //= p
 				if (c != 1):
-					factors.append(c)
+					factors += self.splitFactor(c)
+				factors.sort()
+				self.factors = []
 				i = 0 
 				while (i < len(factors)):
 					self.factors.append([factors[i], 0])
 					while (i < len(factors) and factors[i] == self.factors[-1][0]):
 						self.factors[-1][1] += 1
 						i += 1
-		self.addMemory()
+				self.addMemory()
 		return self.factors
 	
+	def factorMany(self, numbers, workers = None, chunksize = 256, ordered = False):
+		"""
+		
+		Factor many positive integers across a pool of processes
+		
+		The input is read lazily in chunks and only a couple of chunks per
+		worker are in flight at once, so arbitrarily long streams use bounded
+		memory.  Numbers already in this factorizer's memory (or covered by
+		its sieve) are answered without a worker, and every result computed by
+		a worker is added to the memory
+		
+		Parameters
+		----------
+		numbers : iterable
+			Any number of positive integers
+		workers : int, default = None
+			The number of worker processes, the number of CPUs if None.  With
+			1 worker everything is factored in this process
+		chunksize : int, default = 256
+			The number of integers sent to a worker at a time
+		ordered : bool, default = False
+			Yield results in input order instead of as soon as they are ready
+		
+		Return
+		------
+		A generator of (n, factors) tuples, where factors is as returned by
+		factor
+		
+		"""
+		if (workers == 1):
+			for n in numbers:
+				yield n, [f[:] for f in self.factor(n)]
+			return
+		workers = workers or cpu_count() or 1
+		numbers = iter(numbers)
+		with ProcessPoolExecutor(max_workers = workers, initializer = startWorker, initargs = (self.memoryLimit, self.sieveLimit)) as executor:
+			# Chunks in submission order: (numbers, answers known here, future)
+			pending = deque()
+			exhausted = False
+			while (True):
+				while (not exhausted and len(pending) < 2 * workers):
+					chunk = [factorizer.check(n) for n in islice(numbers, chunksize)]
+					if (len(chunk) == 0):
+						exhausted = True
+						break
+					known = {}
+					todo = []
+					for n in chunk:
+						if (self.sieve is not None and n <= self.sieveLimit):
+							known[n] = self.sieveFactor(n)
+							continue
+						try:
+							known[n] = self.memory[n]
+						except KeyError:
+							todo.append(n)
+					future = executor.submit(factorChunk, todo) if (len(todo) > 0) else None
+					pending.append((chunk, known, future))
+				if (len(pending) == 0):
+					return
+				if (ordered):
+					entry = pending.popleft()
+				else:
+					entry = next((e for e in pending if (e[2] is None or e[2].done())), None)
+					if (entry is None):
+						wait([e[2] for e in pending], return_when = FIRST_COMPLETED)
+						entry = next(e for e in pending if (e[2].done()))
+					pending.remove(entry)
+				chunk, known, future = entry
+				if (future is not None):
+					results = future.result()
+					self.memory.update(results)
+					known.update(results)
+				# Copies, so that changing a result cannot change the memory
+				for n in chunk:
+					yield n, [f[:] for f in known[n]]
+	
+	def splitFactor(self, n):
+		"""
+		
+		An internal function to break n into its prime factors
+		
+		Primes are recognised with isPrime and composites are split with
+		Brent's variant of Pollard's rho, recursing on both halves
+		
+		Parameters
+		----------
+		n : int
+			An integer greater than 1 with no prime factors below 1000
+		
+		Return
+		------
+		An unsorted list of the prime factors of n, repeated by multiplicity
+		
+		"""
+		if (n < smallPrimes[-1] ** 2 or self.isPrime(n)):
+			return [n]
+		r = isqrt(n)
+		if (r * r == n):
+			return self.splitFactor(r) * 2
+		d = self.pollardBrent(n)
+		return self.splitFactor(d) + self.splitFactor(n // d)
+	
+	def isPrime(self, n, rounds = 16):
+		"""
+		
+		Test whether an integer is prime
+		
+		Uses trial division for small inputs and the Miller-Rabin test above
+		that.  The test is deterministic for n < 3.3 * 10^24 (which covers
+		every 64-bit integer) and probabilistic beyond, with a chance of
+		error of at most 4^-rounds
+		
+		Parameters
+		----------
+		n : int
+			An integer
+		rounds : int, default = 16
+			The number of random bases tried when n is too large for the
+			deterministic test
+		
+		Return
+		------
+		True if n is (almost certainly) prime, False if not
+		
+		"""
+		if (n < 2):
+			return False
+		for p in smallPrimes:
+			if (n % p == 0):
+				return n == p
+			if (p * p > n):
+				return True
+		d = n - 1
+		s = 0
+		while (d % 2 == 0):
+			d //= 2
+			s += 1
+		bases = list(millerRabinBases)
+		if (n >= 3317044064679887385961981):
+			bases += [randrange(2, n - 1) for i in range(0, rounds)]
+		for a in bases:
+			x = pow(a, d, n)
+			if (x == 1 or x == n - 1):
+				continue
+			for i in range(0, s - 1):
+				x = x * x % n
+				if (x == n - 1):
+					break
+			else:
+				return False
+		return True
+	
+	def pollardBrent(self, n):
+		"""
+		
+		Find a non-trivial divisor of a composite number
+		
+		Uses Brent's variant of Pollard's rho algorithm, batching the gcd
+		computations and retrying with a new random polynomial on failure
+		
+		Parameters
+		----------
+		n : int
+			An odd composite integer
+		
+		Return
+		------
+		A divisor d of n with 1 < d < n
+		
+		"""
+		if (n % 2 == 0):
+			return 2
+		m = 128
+		while (True):
+			y = randrange(1, n)
+			c = randrange(1, n)
+			g = r = q = 1
+			while (g == 1):
+				x = y
+				for i in range(0, r):
+					y = (y * y + c) % n
+				k = 0
+				while (k < r and g == 1):
+					ys = y
+					for i in range(0, min(m, r - k)):
+						y = (y * y + c) % n
+						q = q * abs(x - y) % n
+					g = gcd(q, n)
+					k += m
+				r *= 2
+			if (g == n):
+				# The batch overshot, so step back one value at a time
+				g = 1
+				while (g == 1):
+					ys = (ys * ys + c) % n
+					g = gcd(abs(x - ys), n)
+			if (g != n):
+				return g
+	
 	def check(n):
 		"""
 		
@@ -240,15 +547,208 @@ class factorizer:
 		"""
 		self.factor(n)
 		for p, a in self.factors:
-			if (a % 2 == 0):
+			if (a > 1):
 				return False
 		return True
 	
+	def phiTable(self, N, useNumpy = True):
+		"""
+		
+		Compute Euler's Phi Function for every integer from 0 to N
+		
+		Uses a single linear sieve pass, so the whole table costs O(N)
+		
+		Parameters
+		----------
+		N : int
+			A positive integer
+		useNumpy : bool, default = True
+			Return a NumPy array (sharing the same buffer) when NumPy is
+			installed
+		
+		Return
+		------
+		A signed 64-bit array whose entry n is euPhi(n) (entry 0 is 0)
+		
+		"""
+		N = factorizer.check(N)
+		phi = array('q', [0]) * (N + 1)
+		phi[1] = 1
+		primes = []
+		for i in range(2, N + 1):
+			if (phi[i] == 0):
+				phi[i] = i - 1
+				primes.append(i)
+			for p in primes:
+				ip = i * p
+				if (ip > N):
+					break
+				if (i % p == 0):
+					phi[ip] = phi[i] * p
+					break
+				phi[ip] = phi[i] * (p - 1)
+		return factorizer.asTable(phi, useNumpy)
+	
+	def mobiusTable(self, N, useNumpy = True):
+		"""
+		
+		Compute the mobius function for every integer from 0 to N
+		
+		Uses a single linear sieve pass, so the whole table costs O(N)
+		
+		Parameters
+		----------
+		N : int
+			A positive integer
+		useNumpy : bool, default = True
+			Return a NumPy array (sharing the same buffer) when NumPy is
+			installed
+		
+		Return
+		------
+		A signed 8-bit array whose entry n is mobius(n) (entry 0 is 0)
+		
+		"""
+		N = factorizer.check(N)
+		mu = array('b', [0]) * (N + 1)
+		mu[1] = 1
+		composite = bytearray(N + 1)
+		primes = []
+		for i in range(2, N + 1):
+			if (not composite[i]):
+				mu[i] = -1
+				primes.append(i)
+			for p in primes:
+				ip = i * p
+				if (ip > N):
+					break
+				composite[ip] = 1
+				if (i % p == 0):
+					break
+				mu[ip] = -mu[i]
+		return factorizer.asTable(mu, useNumpy)
+	
+	def divisorCountTable(self, N, useNumpy = True):
+		"""
+		
+		Compute the number of divisors of every integer from 0 to N
+		
+		Uses a single linear sieve pass, so the whole table costs O(N)
+		
+		Parameters
+		----------
+		N : int
+			A positive integer
+		useNumpy : bool, default = True
+			Return a NumPy array (sharing the same buffer) when NumPy is
+			installed
+		
+		Return
+		------
+		A signed 64-bit array whose entry n is divs(n) (entry 0 is 0)
+		
+		"""
+		N = factorizer.check(N)
+		d = array('q', [0]) * (N + 1)
+		d[1] = 1
+		# The exponent of the smallest prime factor of each number
+		e = array('B', [0]) * (N + 1)
+		primes = []
+		for i in range(2, N + 1):
+			if (d[i] == 0):
+				d[i] = 2
+				e[i] = 1
+				primes.append(i)
+			for p in primes:
+				ip = i * p
+				if (ip > N):
+					break
+				if (i % p == 0):
+					e[ip] = e[i] + 1
+					d[ip] = d[i] // (e[i] + 1) * (e[i] + 2)
+					break
+				e[ip] = 1
+				d[ip] = d[i] * 2
+		return factorizer.asTable(d, useNumpy)
+	
+	def divisorSumTable(self, N, useNumpy = True):
+		"""
+		
+		Compute the sum of the divisors of every integer from 0 to N
+		
+		Uses a single linear sieve pass, so the whole table costs O(N)
+		
+		Parameters
+		----------
+		N : int
+			A positive integer
+		useNumpy : bool, default = True
+			Return a NumPy array (sharing the same buffer) when NumPy is
+			installed
+		
+		Return
+		------
+		A signed 64-bit array whose entry n is divSum(n) (entry 0 is 0)
+		
+		"""
+		N = factorizer.check(N)
+		ds = array('q', [0]) * (N + 1)
+		ds[1] = 1
+		# The largest power of the smallest prime factor dividing each number
+		pk = array('q', [0]) * (N + 1)
+		# The divisor sum of that prime power
+		pkSum = array('q', [0]) * (N + 1)
+		primes = []
+		for i in range(2, N + 1):
+			if (ds[i] == 0):
+				ds[i] = pkSum[i] = i + 1
+				pk[i] = i
+				primes.append(i)
+			for p in primes:
+				ip = i * p
+				if (ip > N):
+					break
+				if (i % p == 0):
+					pk[ip] = pk[i] * p
+					pkSum[ip] = pkSum[i] + pk[ip]
+					ds[ip] = ds[i] // pkSum[i] * pkSum[ip]
+					break
+				pk[ip] = p
+				pkSum[ip] = p + 1
+				ds[ip] = ds[i] * (p + 1)
+		return factorizer.asTable(ds, useNumpy)
+	
+	@staticmethod
+	def asTable(values, useNumpy):
+		"""
+		
+		An internal function to hand a computed table back to the caller
+		
+		Parameters
+		----------
+		values : array
+			The computed table
+		useNumpy : bool
+			Whether to wrap the table in a NumPy array if NumPy is installed
+		
+		Return
+		------
+		Either values itself or a NumPy array viewing the same buffer
+		
+		"""
+		if (useNumpy and numpy is not None):
+			return numpy.frombuffer(values, dtype = values.typecode)
+		return values
+	
 	def ord(self, a, m):
 		"""
 		
 		Find the order of a modulo m
 		
+		The order divides the Carmichael function of m, so starting from
+		carmichael(m) each prime factor is stripped while a^k is still
+		congruent to 1.  This takes O(log m) modular exponentiations
+		
 		Parameters
 		----------
 		a : int
@@ -258,14 +758,50 @@ class factorizer:
 		
 		Return
 		------
-		The smallest positive integer k such that a^k is congruent to 1 modulo m
+		The smallest positive integer k such that a^k is congruent to 1 modulo
+		m, or None if a and m are not coprime
+		
+		"""
+		return self.ordMany([a], m)[0]
+	
+	def ordMany(self, values, m):
+		"""
+		
+		Find the orders of many numbers modulo the same m
+		
+		Carmichael's function of m and its factorization are computed once and
+		shared by every value
+		
+		Parameters
+		----------
+		values : iterable
+			Any number of positive integers
+		m : int
+			A positive integer
+		
+		Return
+		------
+		A list with the order of each value modulo m (None for values not
+		coprime with m)
 		
 		"""
-		if (self.gcd(a, m) == 1):
-			return None
-		for k in range(1, m):
-			if ((a ** k) % m == 1):
-				return k
+		m = factorizer.check(m)
+		l = self.carmichael(m)
+		lFactors = [(p, a) for p, a in self.factor(l)]
+		orders = []
+		for a in values:
+			a %= m
+			if (gcd(a, m) != 1):
+				orders.append(None)
+				continue
+			k = l
+			for p, e in lFactors:
+				for i in range(0, e):
+					if (pow(a, k // p, m) != 1):
+						break
+					k //= p
+			orders.append(k)
+		return orders
 	
 	def carmichael(self, n):
 		"""
@@ -282,10 +818,11 @@ class factorizer:
 		The lowest k such that a^k is congruent to 1 modulo n for any a coprime with n
 		
 		"""
-		self.factor(n)
 		if (factorizer.check(n) == 1):
 			return 1
-		return self.lcm(*[(p ** (a - 1) * (p - 1)) for p, a in self.factors])
+		self.factor(n)
+		# Powers of 2 above 4 have half the totient rather than the totient
+		return self.lcm(*[(p ** (a - 1) * (p - 1)) // (2 if (p == 2 and a > 2) else 1) for p, a in self.factors])
 	
 	def digitSum(self, n, b = 10):
 		"""
@@ -325,18 +862,9 @@ class factorizer:
 		The largest positive integer which divides all the inputs
 		
 		"""
-		nArgs = len(args)
-		if (nArgs == 0):
+		if (len(args) == 0):
 			raise TypeError("No input provided")
-		elif (nArgs == 1):
-			return args[0]
-		elif (nArgs > 2):
-			return self.gcd(args[-1], self.gcd(*args[0:-1]))
-		a, b = max(args[0], args[1]), min(args[0], args[1])
-		a, b = b % a, a
-		while (a > 0):
-			a, b = b % a, a
-		return b
+		return gcd(*args)
 	
 	def lcm(self, *args):
 		"""
@@ -353,10 +881,26 @@ class factorizer:
 		The least positive integer which is a multiple of all the inputs
 		
 		"""
-		nArgs = len(args)
 		if (len(args) == 0):
 			raise TypeError("No input provided")
-		p = 1
-		for n in args:
-			p *= n
-		return p // (self.gcd(*args) ** (nArgs - 1))
+		return lcm(*args)
+
+# The factorizer used by each worker process of factorizer.factorMany
+workerFactorizer = None
+
+def startWorker(memoryLimit, sieveLimit):
+	"""
+	
+	Set up a worker process for factorizer.factorMany
+	
+	"""
+	global workerFactorizer
+	workerFactorizer = factorizer(memoryLimit = memoryLimit, sieveLimit = sieveLimit)
+
+def factorChunk(numbers):
+	"""
+	
+	Factor a chunk of numbers in a worker process for factorizer.factorMany
+	
+	"""
+	return [(n, workerFactorizer.factor(n)) for n in numbers]
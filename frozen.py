@@ -0,0 +1,239 @@
+from functools import wraps
+from . import sparse
+from .memory import memory
+from .polynomial import polynomial
+
+def memoize(memoryLimit = 256):
+	"""
+
+	Remember the results of a function of hashable arguments
+
+	The results are kept in a memory object, so only the memoryLimit most
+	recently used are kept.  The memory is available as the memory attribute
+	of the decorated function, for its stats or to clear it
+
+	Parameters
+	----------
+	memoryLimit : int, default = 256
+		The number of results to keep
+
+	"""
+	def decorate(f):
+		results = memory({}, memoryLimit = memoryLimit)
+		@wraps(f)
+		def memoized(*args):
+			# Equal arguments of different types, like 2 and 2.0, can give
+			# results of different types, so they are remembered separately
+			key = args + tuple(signature(a) for a in args)
+			try:
+				return results[key]
+			except KeyError:
+				pass
+			except TypeError:
+				# Unhashable arguments, like mutable polynomials, are not remembered
+				return f(*args)
+			r = f(*args)
+			results[key] = r
+			return r
+		memoized.memory = results
+		return memoized
+	return decorate
+
+def signature(a):
+	# The type of a, and for frozen polynomials the types of the coefficients,
+	# which equality and hashing ignore
+	if (isinstance(a, frozenPolynomial)):
+		return (frozenPolynomial,) + tuple(type(c) for c in a.consts)
+	return type(a)
+
+def thaw(p):
+	# The mutable form of p if it is frozen, otherwise p itself
+	return p.thaw() if (isinstance(p, frozenPolynomial)) else p
+
+class frozenPolynomial:
+
+	# Instances are immutable, so everything derived from the terms is
+	# computed once here rather than on every use
+	__slots__ = ('consts', 'powers', 'var', 'nMod', 'pMod', 'degree', 'leading', 'hashValue')
+
+	def __init__(self, p = 0, var = 'x', nMod = None, pMod = None):
+		"""
+
+		Create an immutable, hashable polynomial
+
+		The terms are kept in canonical form, as tuples of coefficients and
+		strictly increasing exponents with no zero coefficients, so equal
+		polynomials have equal storage.  Frozen polynomials can be used as
+		dictionary keys, and their products, powers, divisions and expMod are
+		memoized
+
+		Parameters
+		----------
+		p : polynomial, frozenPolynomial, number or str, default = 0
+			The polynomial to freeze.  Anything else is first passed to the
+			polynomial constructor along with var, nMod and pMod
+		var : char, default = 'x'
+			The variable, if p is not already a polynomial
+		nMod : int, default = None
+			The coefficient modulus, if p is not already a polynomial
+		pMod : polynomial or frozenPolynomial, default = None
+			The polynomial modulus, if p is not already a polynomial
+
+		"""
+		if (isinstance(p, frozenPolynomial)):
+			for name in frozenPolynomial.__slots__:
+				object.__setattr__(self, name, getattr(p, name))
+			return
+		if (not isinstance(p, polynomial)):
+			p = polynomial(p, var = var, nMod = nMod, pMod = thaw(pMod))
+		consts, powers = sparse.terms(p.constList, p.powerList)
+		if (p.nMod is not None):
+			consts, powers = sparse.clean(consts, powers, p.nMod)
+		pMod = None if (p.pMod is None) else frozenPolynomial(p.pMod)
+		if (len(powers) == 0):
+			degree, leading = 0, (0, 0)
+		else:
+			degree, leading = powers[-1], (consts[-1], powers[-1])
+		if (p.nMod is None and pMod is None and (len(powers) == 0 or (len(powers) == 1 and powers[0] == 0))):
+			# Constants hash like the numbers they equal
+			hashValue = hash(leading[0])
+		else:
+			hashValue = hash((tuple(consts), tuple(powers), p.var, p.nMod, pMod))
+		for name, value in zip(frozenPolynomial.__slots__, (tuple(consts), tuple(powers), p.var, p.nMod, pMod, degree, leading, hashValue)):
+			object.__setattr__(self, name, value)
+
+	"""
+
+	Magic methods
+
+	"""
+	def __add__(self, p):
+		return frozenPolynomial(self.thaw() + thaw(p))
+
+	def __call__(self, x):
+		if (len(self.powers) == 0):
+			return 0
+		return polynomial.horner(list(zip(reversed(self.consts), reversed(self.powers))), x)
+
+	def __delattr__(self, name):
+		raise AttributeError("frozenPolynomial objects are immutable")
+
+	@memoize()
+	def __divmod__(self, p):
+		q, r = divmod(self.thaw(), thaw(p))
+		return frozenPolynomial(q), frozenPolynomial(r)
+
+	def __eq__(self, p):
+		if (isinstance(p, frozenPolynomial)):
+			return self.hashValue == p.hashValue and self.powers == p.powers and self.consts == p.consts and self.var == p.var and self.nMod == p.nMod and self.pMod == p.pMod
+		elif (isinstance(p, polynomial)):
+			return self == frozenPolynomial(p)
+		elif (polynomial.isNumType(p)):
+			return self.nMod is None and self.pMod is None and self.isConstant() and self.leading[0] == p
+		return NotImplemented
+
+	@memoize()
+	def __floordiv__(self, p):
+		return frozenPolynomial(self.thaw() // thaw(p))
+
+	def __getitem__(self, i):
+		return self.consts[i], self.powers[i]
+
+	def __hash__(self):
+		return self.hashValue
+
+	def __iter__(self):
+		return zip(self.consts, self.powers)
+
+	def __len__(self):
+		return len(self.powers)
+
+	@memoize()
+	def __mod__(self, m):
+		return frozenPolynomial(self.thaw() % thaw(m))
+
+	@memoize()
+	def __mul__(self, p):
+		return frozenPolynomial(self.thaw() * thaw(p))
+
+	def __ne__(self, p):
+		return not (self == p)
+
+	def __neg__(self):
+		return frozenPolynomial(-self.thaw())
+
+	@memoize()
+	def __pow__(self, p):
+		return frozenPolynomial(self.thaw() ** p)
+
+	def __radd__(self, p):
+		return self + p
+
+	def __reduce__(self):
+		# The default pickling would set the attributes one by one
+		return (frozenPolynomial, (self.thaw(),))
+
+	def __repr__(self):
+		return f"<frozenPolynomial: {self.__str__()}>"
+
+	def __rmul__(self, p):
+		return self * p
+
+	def __rsub__(self, p):
+		return -self + p
+
+	def __setattr__(self, name, value):
+		raise AttributeError("frozenPolynomial objects are immutable")
+
+	def __str__(self):
+		return self.thaw().__str__()
+
+	def __sub__(self, p):
+		return frozenPolynomial(self.thaw() - thaw(p))
+
+	"""
+
+	Other methods
+
+	"""
+
+	@staticmethod
+	@memoize()
+	def expMod(p, a, m):
+		"""
+
+		Raise p to the power a modulo the polynomial m, remembering the result
+
+		Parameters
+		----------
+		p : frozenPolynomial
+			The base
+		a : int
+			A non-negative integer
+		m : frozenPolynomial
+			The modulus
+
+		Return
+		------
+		The remainder of p^a divided by m, as a frozenPolynomial
+
+		"""
+		return frozenPolynomial(polynomial.expMod(thaw(p), a, thaw(m)))
+
+	def isConstant(self):
+		return len(self.powers) == 0 or (len(self.powers) == 1 and self.powers[0] == 0)
+
+	def thaw(self):
+		"""
+
+		Create a mutable copy of the polynomial
+
+		Return
+		------
+		A polynomial with the same terms and moduli
+
+		"""
+		p = polynomial.fromTerms(list(self.consts), list(self.powers), var = self.var)
+		p.nMod = self.nMod
+		p.pMod = None if (self.pMod is None) else self.pMod.thaw()
+		return p
@@ -0,0 +1,202 @@
+from functools import wraps
+from time import perf_counter
+from .dense import reducers
+from .factorizer import factorizer
+from .matrix import luDecomposition, matrix
+from .memory import memory
+from .polynomial import compiledExpressions, expression, polynomial
+from .rational import rational
+
+# Opt-in call counting and timing.  enable replaces the methods of the
+# library's classes with wrappers that count calls, exceptions and wall time,
+# and disable puts the original methods back, so there is no cost at all while
+# instrumentation is off.  Times are inclusive: a method that calls itself
+# (like a cofactor expansion recursing into minors) or other instrumented
+# methods counts their time as its own
+
+# The classes that can be instrumented, by name
+classes = {
+	'polynomial': polynomial,
+	'expression': expression,
+	'factorizer': factorizer,
+	'memory': memory,
+	'matrix': matrix,
+	'luDecomposition': luDecomposition,
+	'rational': rational
+	}
+
+# The bounded caches shared across the library, by name
+caches = {
+	'compiledExpressions': compiledExpressions,
+	'reducers': reducers
+	}
+
+# The counters of every method ever instrumented, keyed by "class.method",
+# each a list of [calls, exceptions raised, seconds]
+counters = {}
+
+# The original attributes replaced by enable, keyed by (class, attribute)
+originals = {}
+
+def wrap(key, f):
+	"""
+
+	An internal function to create the instrumented version of a function
+
+	"""
+	counter = counters.setdefault(key, [0, 0, 0.0])
+	@wraps(f)
+	def instrumented(*args, **kwargs):
+		counter[0] += 1
+		start = perf_counter()
+		try:
+			return f(*args, **kwargs)
+		except BaseException:
+			counter[1] += 1
+			raise
+		finally:
+			counter[2] += perf_counter() - start
+	return instrumented
+
+def enable(*names):
+	"""
+
+	Start counting calls to the methods of the library's classes
+
+	Parameters
+	----------
+	*names : str
+		The names of the classes to instrument (see classes).  All of them
+		if none are given
+
+	"""
+	for name in (names or classes.keys()):
+		cls = classes[name]
+		for attribute, value in list(vars(cls).items()):
+			if ((cls, attribute) in originals):
+				continue
+			key = f"{name}.{attribute}"
+			if (isinstance(value, staticmethod)):
+				wrapped = staticmethod(wrap(key, value.__func__))
+			elif (isinstance(value, classmethod)):
+				wrapped = classmethod(wrap(key, value.__func__))
+			elif (callable(value) and not isinstance(value, type)):
+				wrapped = wrap(key, value)
+			else:
+				continue
+			originals[(cls, attribute)] = value
+			setattr(cls, attribute, wrapped)
+
+def disable():
+	"""
+
+	Stop counting calls and restore the original methods
+
+	The counters are kept, so they can still be read with snapshot
+
+	"""
+	for (cls, attribute), value in originals.items():
+		setattr(cls, attribute, value)
+	originals.clear()
+
+def isEnabled():
+	return len(originals) > 0
+
+def reset():
+	"""
+
+	Set every counter back to zero
+
+	"""
+	for counter in counters.values():
+		counter[:] = [0, 0, 0.0]
+
+def snapshot():
+	"""
+
+	Report the counters collected so far
+
+	Return
+	------
+	A dictionary with two entries.  'calls' maps each "class.method" that
+	was called to its number of calls, exceptions raised and cumulative
+	seconds.  'caches' holds the hits and misses of memory lookups counted
+	across every memory object, along with the current stats of the
+	library's shared caches
+
+	"""
+	return summarize({key: tuple(counter) for key, counter in counters.items()})
+
+def summarize(counts, cacheStart = None):
+	"""
+
+	An internal function to build a snapshot from raw counters, with the
+	shared caches' counters taken relative to cacheStart if given
+
+	"""
+	calls = {}
+	for key, (n, errors, seconds) in counts.items():
+		if (n > 0):
+			calls[key] = {'calls': n, 'exceptions': errors, 'time': seconds}
+	# A memory lookup that raises is a miss
+	lookups, misses, seconds = counts.get('memory.__getitem__', (0, 0, 0.0))
+	summary = {
+		'memory': {
+			'hits': lookups - misses,
+			'misses': misses,
+			'hitRate': ((lookups - misses) / lookups) if (lookups > 0) else 0.0
+			}
+		}
+	for name, cache in caches.items():
+		stats = cache.stats()
+		if (cacheStart is not None):
+			for key in ('hits', 'misses', 'evictions', 'storeHits'):
+				stats[key] -= cacheStart[name][key]
+			lookups = stats['hits'] + stats['misses']
+			stats['hitRate'] = (stats['hits'] / lookups) if (lookups > 0) else 0.0
+		summary[name] = stats
+	return {'calls': calls, 'caches': summary}
+
+class instrumented:
+
+	"""
+
+	A context manager that instruments the library for the length of a
+	with block
+
+	The counts made inside the block, including the hits and misses of the
+	shared caches, are available afterwards as the stats attribute, in the
+	form returned by snapshot.  Blocks can be nested: on exit only the
+	methods the block itself instrumented are restored, and counters outside
+	the block are not reset
+
+	Parameters
+	----------
+	*names : str
+		The names of the classes to instrument.  All of them if none are
+		given
+
+	"""
+	def __init__(self, *names):
+		self.names = names
+		self.stats = None
+
+	def __enter__(self):
+		self.cacheStart = {name: cache.stats() for name, cache in caches.items()}
+		before = set(originals)
+		enable(*self.names)
+		# The methods this block instrumented, which are the ones it restores
+		self.added = [key for key in originals if key not in before]
+		self.start = {key: tuple(counter) for key, counter in counters.items()}
+		return self
+
+	def __exit__(self, *exception):
+		counts = {}
+		for key, counter in counters.items():
+			before = self.start.get(key, (0, 0, 0.0))
+			counts[key] = tuple(now - then for now, then in zip(counter, before))
+		for cls, attribute in self.added:
+			if ((cls, attribute) in originals):
+				setattr(cls, attribute, originals.pop((cls, attribute)))
+		self.stats = summarize(counts, self.cacheStart)
+		return False
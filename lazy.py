@@ -0,0 +1,294 @@
+from copy import copy
+from heapq import heapify, heappop, heappush
+from .frozen import frozenPolynomial, signature
+from .memory import memory
+from .polynomial import polynomial
+
+class lazyPolynomial:
+
+	# A node of an expression graph: the operation, its operands and, once
+	# evaluated, the resulting polynomial
+	__slots__ = ('op', 'args', 'value')
+
+	def __new__(cls, p = 0, var = 'x'):
+		"""
+
+		Create a lazy polynomial
+
+		Arithmetic on lazy polynomials builds a graph of operations instead
+		of computing anything.  Nodes are shared: building the same
+		subexpression twice (with the same operands) gives the same node, so
+		a repeated subterm like (x + 1)^50 is only computed once, and a node
+		keeps its value once evaluated.  Sums and products of many operands
+		are flattened, and on evaluation the smallest operands are combined
+		first.  Products use polynomial.mul and powers use square and multiply
+
+		Parameters
+		----------
+		p : polynomial, frozenPolynomial, number or str, default = 0
+			The value of the new leaf node
+		var : char, default = 'x'
+			The variable, if p is not already a polynomial
+
+		"""
+		return lazyPolynomial.make('leaf', (frozenPolynomial(p, var = var),))
+
+	"""
+
+	Magic methods
+
+	"""
+	def __add__(self, p):
+		return lazyPolynomial.make('add', (self, lift(p)))
+
+	def __call__(self, x):
+		return self.evaluate()(x)
+
+	def __mod__(self, m):
+		return lazyPolynomial.make('mod', (self, lift(m)))
+
+	def __mul__(self, p):
+		return lazyPolynomial.make('mul', (self, lift(p)))
+
+	def __neg__(self):
+		if (self.op == 'neg'):
+			return self.args[0]
+		return lazyPolynomial.make('neg', (self,))
+
+	def __pow__(self, k):
+		if (type(k) is not int or k < 0):
+			raise ArithmeticError("Polynomial objects can only be raised to positive integer powers")
+		if (k == 0):
+			return lazyPolynomial(1, var = self.variable())
+		elif (k == 1):
+			return self
+		elif (self.op == 'pow'):
+			return lazyPolynomial.make('pow', (self.args[0], self.args[1] * k))
+		return lazyPolynomial.make('pow', (self, k))
+
+	def __radd__(self, p):
+		return lift(p) + self
+
+	def __repr__(self):
+		return f"<lazyPolynomial: {self.__str__()}>"
+
+	def __rmod__(self, p):
+		return lift(p) % self
+
+	def __rmul__(self, p):
+		return lift(p) * self
+
+	def __rsub__(self, p):
+		return lift(p) - self
+
+	def __str__(self):
+		if (self.op == 'leaf'):
+			return f"({self.args[0]})"
+		elif (self.op == 'add'):
+			return "(" + " + ".join(str(a) for a in self.args) + ")"
+		elif (self.op == 'mul'):
+			return "(" + " * ".join(str(a) for a in self.args) + ")"
+		elif (self.op == 'neg'):
+			return f"-{self.args[0]}"
+		elif (self.op == 'pow'):
+			return f"{self.args[0]}^{self.args[1]}"
+		return f"({self.args[0]} % {self.args[1]})"
+
+	def __sub__(self, p):
+		return self + -lift(p)
+
+	"""
+
+	Other methods
+
+	"""
+
+	def evaluate(self):
+		"""
+
+		Compute the polynomial the graph describes
+
+		Every node below this one that has no value yet is computed once,
+		operands before the operations using them
+
+		Return
+		------
+		The polynomial, as a new object that can be changed freely
+
+		"""
+		# Post-order walk without recursion, so deep graphs are fine
+		order = []
+		seen = set()
+		stack = [(self, False)]
+		while (len(stack) > 0):
+			n, expanded = stack.pop()
+			if (expanded):
+				order.append(n)
+			elif (n.value is None and id(n) not in seen):
+				seen.add(id(n))
+				stack.append((n, True))
+				for a in n.operands():
+					stack.append((a, False))
+		for n in order:
+			n.value = n.compute()
+		return copy(self.value)
+
+	def compute(self):
+		"""
+
+		An internal function to compute the value of a node whose operands
+		are already evaluated
+
+		"""
+		op = self.op
+		if (op == 'leaf'):
+			return self.args[0].thaw()
+		elif (op == 'neg'):
+			return -self.args[0].value
+		elif (op == 'pow'):
+			return self.args[0].value ** self.args[1]
+		elif (op == 'mod'):
+			m = self.args[1]
+			if (m.op == 'leaf' and m.args[0].isConstant()):
+				# A number reduces the coefficients, as in polynomial.fromString
+				return self.args[0].value % m.args[0].leading[0]
+			return self.args[0].value % m.value
+		values = [a.value for a in self.args]
+		if (op == 'add'):
+			# One pass over every term instead of a chain of sums
+			terms = {}
+			for v in values:
+				for const, power in v:
+					terms[power] = terms.get(power, 0) + const
+			r = polynomial.fromDict(terms, var = values[0].var)
+			source = next((v for v in values if (v.nMod is not None or v.pMod is not None)), values[0])
+			return source.reduce(r)
+		# op == 'mul': multiply the two smallest factors until one is left,
+		# which keeps the intermediate products as small as possible
+		heap = [(len(v), i, v) for i, v in enumerate(values)]
+		heapify(heap)
+		i = len(heap)
+		while (len(heap) > 1):
+			a = heappop(heap)[2]
+			b = heappop(heap)[2]
+			p = a * b
+			heappush(heap, (len(p), i, p))
+			i += 1
+		return heap[0][2]
+
+	def forget(self):
+		# Drop the cached value of this node so the next evaluation redoes it
+		self.value = None
+
+	def operands(self):
+		# The nodes this node's value depends on
+		if (self.op == 'leaf'):
+			return ()
+		elif (self.op == 'pow'):
+			return self.args[:1]
+		return self.args
+
+	def variable(self):
+		n = self
+		while (n.op != 'leaf'):
+			n = n.args[0]
+		return n.args[0].var
+
+	@staticmethod
+	def fromString(str, var = 'x', **kwargs):
+		"""
+
+		Parse a string into a lazy polynomial
+
+		The string is compiled as for polynomial.fromString, but the compiled
+		expression is turned into a graph of operations rather than evaluated
+
+		Parameters
+		----------
+		str : string
+			The expression to parse
+		var : char, default = 'x'
+			The variable used in the expression
+		**kwargs : dictionary list
+			The values of any named constants in the expression
+
+		Return
+		------
+		The lazy polynomial described by the string
+
+		"""
+		e = polynomial.compile(str, var = var, names = kwargs.keys())
+		stack = []
+		for kind, value in e.program:
+			if (kind == 'num'):
+				stack.append(lazyPolynomial(value, var = var))
+			elif (kind == 'var'):
+				stack.append(lazyPolynomial(polynomial(1, 1, var = var)))
+			elif (kind == 'name'):
+				if (value not in kwargs):
+					raise ValueError(f"No value given for constant {value}")
+				v = kwargs[value]
+				if (not polynomial.isNumType(v)):
+					raise ValueError(f"Constant values must be numbers ({v} is not a number)")
+				stack.append(lazyPolynomial(v, var = var))
+			else:
+				b = stack.pop()
+				a = stack.pop()
+				if (value == '+'):
+					stack.append(a + b)
+				elif (value == '-'):
+					stack.append(a - b)
+				elif (value == '*'):
+					stack.append(a * b)
+				elif (value == '%'):
+					stack.append(a % b)
+				else:
+					# value == '^'
+					if (b.op != 'leaf' or not b.args[0].isConstant()):
+						raise ArithmeticError("Polynomial objects can only be raised to positive integer powers")
+					k = b.args[0].leading[0]
+					if (a.op == 'leaf' and a.args[0].isConstant()):
+						stack.append(lazyPolynomial(a.args[0].leading[0] ** k, var = var))
+					else:
+						stack.append(a ** k)
+		return stack.pop()
+
+	@staticmethod
+	def make(op, args):
+		"""
+
+		An internal function to create a node, or find the existing node with
+		the same operation and operands
+
+		Sums and products are flattened into a single node with their
+		operands in a fixed order, so that the same sum or product built in a
+		different order is still the same node
+
+		"""
+		if (op == 'add' or op == 'mul'):
+			flat = []
+			for a in args:
+				flat += a.args if (a.op == op) else (a,)
+			args = tuple(sorted(flat, key = id))
+		key = (op, args)
+		if (op == 'leaf'):
+			# A leaf of 1.0 equals a leaf of 1 but must not become one
+			key += (signature(args[0]),)
+		try:
+			return nodes[key]
+		except KeyError:
+			n = object.__new__(lazyPolynomial)
+			n.op = op
+			n.args = args
+			n.value = None
+			nodes[key] = n
+			return n
+
+def lift(p):
+	# p as a lazy polynomial, wrapping it in a leaf if it isn't one
+	return p if (isinstance(p, lazyPolynomial)) else lazyPolynomial(p)
+
+# The most recently created nodes, keyed by operation and operands (and, for
+# leaves, the coefficient types).  An evicted node keeps working, but building
+# it again gives a new node
+nodes = memory({}, memoryLimit = 4096)
@@ -1,5 +1,25 @@
 # REMEMBER MATRICES START AT [1, 1]
 
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from functools import partial
+from operator import mul
+from .checkErrors import isType
+from .factorizer import factorizer
+from .rational import rational
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+# Products with all dimensions above this size use Strassen's algorithm when
+# the entries are exact
+strassenThreshold = 64
+# Products with at least this many scalar multiplications go to NumPy when
+# it is installed and the entries fit a NumPy type
+numpyThreshold = 512
+
 class matrix:
 	
 	def __init__(self, values):
@@ -44,19 +64,11 @@ class matrix:
 		return self.nRows * self.nCols
 	
 	def __mul__(self, m):
-		try:
+		if (isType(m, matrix)):
 			if (self.nCols != m.nRows):
 				raise ValueError("Multiplication error")
-			r = matrix.zero(self.nRows, m.nCols)
-			for i in range(1, self.nRows + 1):
-				for j in range(1, m.nCols + 1):
-					r[i, j] = sum([self[i, n] * m[n, j] for n in range(1, self.nCols + 1)])
-		except AttributeError:
-			r = matrix.zero(self.nRows, self.nCols)
-			for i in range(1, self.nRows + 1):
-				for j in range(1, self.nCols + 1):
-					r[i, j] = m * self[i, j]
-		return r
+			return matrix(matrix.multiply(self.values, m.values))
+		return matrix([[m * a for a in row] for row in self.values])
 	
 	def __neq__(self, m):
 		return not self == m
@@ -67,15 +79,21 @@ class matrix:
 		if (a < 0):
 			return self.inv() ** -a
 		r = matrix.identity(self.nCols)
-		for i in range(0, a):
-			r = r * self
+		b = self
+		# Square and multiply
+		while (a > 0):
+			if (a & 1):
+				r = r * b
+			a >>= 1
+			if (a > 0):
+				b = b * b
 		return r
 	
 	def __rmul__(self, m):
-		return m * self
+		return matrix([[m * a for a in row] for row in self.values])
 	
 	def __rtruediv__(self, m):
-		return m * self ** -1
+		return self.lu().solve(matrix.identity(self.nRows) * m)
 	
 	def __setitem__(self, index, value):
 		self.values[index[0] - 1][index[1] - 1] = value
@@ -93,6 +111,9 @@ class matrix:
 		return ret
 	
 	def __truediv__(self, m):
+		if (isType(m, matrix)):
+			# self * m^-1 is the transpose of the solution of m^T X = self^T
+			return m.transpose().lu().solve(self.transpose()).transpose()
 		return self * m ** -1
 	
 	"""
@@ -113,12 +134,59 @@ class matrix:
 		self.nRows += 1
 		self.values += [[row]]
 	
-	def det(self):
+	def det(self, method = None, workers = 1):
+		"""
+		
+		Compute the determinant of a square matrix
+		
+		Parameters
+		----------
+		method : str, default = None
+			"bareiss" for fraction-free elimination over the integers,
+			"modular" for elimination modulo many primes recombined with the
+			Chinese remainder theorem (integer entries only), "elimination"
+			for Gaussian elimination (exact for rational entries, partially
+			pivoted for floats) or "cofactor" for cofactor expansion.  If
+			None, the method is chosen from the entry types
+		workers : int, default = 1
+			The number of processes to share the primes between when method
+			is "modular"
+		
+		Return
+		------
+		The determinant of the matrix
+		
+		"""
+		if (not self.isSquare()):
+			raise ValueError("Only square matrices have determinants")
+		if (method == None):
+			method = self.detMethod()
+		if (method == "bareiss"):
+			return matrix.bareiss([row[:] for row in self.values])
+		elif (method == "elimination"):
+			if (any(isType(a, float) for row in self.values for a in row)):
+				return matrix.eliminate([[float(a) for a in row] for row in self.values])
+			d = matrix.eliminate([[matrix.toExact(a) for a in row] for row in self.values])
+			return matrix.fromExact(d)
+		elif (method == "modular"):
+			return matrix.modularDet(self.values, workers)
+		elif (method == "cofactor"):
+			return self.cofactor()
+		raise ValueError(f"Unknown determinant method: {method}")
+	
+	def detMethod(self):
+		if (all(type(a) is int for row in self.values for a in row)):
+			return "bareiss"
+		elif (all(isType(a, int, float, rational) for row in self.values for a in row)):
+			return "elimination"
+		return "cofactor"
+	
+	def cofactor(self):
 		if (len(self) == 1):
 			return self[1, 1]
 		t = 0
 		for j in range(1, self.nCols + 1):
-			t -= (-1) ** j * self[1, j] * self.reduced(1, j).det()
+			t -= (-1) ** j * self[1, j] * self.reduced(1, j).cofactor()
 		return t
 	
 	def dim(self):
@@ -137,10 +205,7 @@ class matrix:
 		return self.values
 	
 	def inv(self):
-		d = self.det()
-		if (d == 0):
-			raise ValueError("Tried to invert a non-invertible matrix")
-		return self.adjoint() / d
+		return self.lu().inv()
 	
 	def isSquare(self):
 		return self.nCols == self.nRows
@@ -152,8 +217,339 @@ class matrix:
 				ret[i, j] = self[i + (i >= row), j + (j >= col)]
 		return ret
 	
+	def lu(self):
+		"""
+		
+		Factor the matrix as PA = LU with partial pivoting
+		
+		Return
+		------
+		An luDecomposition object which can solve systems, invert and take
+		the determinant of the matrix without refactoring it
+		
+		"""
+		return luDecomposition(self)
+	
 	def transpose(self):
-		return matrix(self.getColumns)
+		return matrix([self.getColumn(j) for j in range(1, self.nCols + 1)])
+	
+	@staticmethod
+	def bareiss(a):
+		"""
+		
+		Compute a determinant with Bareiss fraction-free elimination
+		
+		Every division is exact, so integer entries stay integers and the
+		whole computation takes O(n^3) operations
+		
+		Parameter
+		---------
+		a : list
+			A list of rows of integers, which is overwritten
+		
+		Return
+		------
+		The determinant of a
+		
+		"""
+		n = len(a)
+		sign = 1
+		prev = 1
+		for k in range(0, n - 1):
+			if (a[k][k] == 0):
+				i = k + 1
+				while (i < n and a[i][k] == 0):
+					i += 1
+				if (i == n):
+					return 0
+				a[k], a[i] = a[i], a[k]
+				sign = -sign
+			rowK = a[k]
+			pivot = rowK[k]
+			for i in range(k + 1, n):
+				rowI = a[i]
+				factor = rowI[k]
+				for j in range(k + 1, n):
+					rowI[j] = (rowI[j] * pivot - factor * rowK[j]) // prev
+			prev = pivot
+		return sign * a[n - 1][n - 1]
+	
+	@staticmethod
+	def eliminate(a):
+		"""
+		
+		Compute a determinant with Gaussian elimination
+		
+		Uses partial pivoting on the entry of largest magnitude, which keeps
+		floats stable and is harmless for exact entries
+		
+		Parameter
+		---------
+		a : list
+			A list of rows of floats or Fractions, which is overwritten
+		
+		Return
+		------
+		The determinant of a
+		
+		"""
+		n = len(a)
+		d = 1
+		for k in range(0, n):
+			p = max(range(k, n), key = lambda i: abs(a[i][k]))
+			if (a[p][k] == 0):
+				return 0 * d
+			if (p != k):
+				a[k], a[p] = a[p], a[k]
+				d = -d
+			rowK = a[k]
+			pivot = rowK[k]
+			d *= pivot
+			for i in range(k + 1, n):
+				rowI = a[i]
+				factor = rowI[k] / pivot
+				if (factor != 0):
+					for j in range(k + 1, n):
+						rowI[j] -= factor * rowK[j]
+		return d
+	
+	@staticmethod
+	def modularDet(a, workers = 1):
+		"""
+		
+		Compute an integer determinant from its residues modulo many primes
+		
+		Hadamard's inequality bounds the determinant by the product of the
+		row lengths, so word-sized primes are taken until their product
+		exceeds twice that bound.  The determinant is found modulo each prime
+		by elimination over Z/pZ (where entries never grow) and the exact
+		value is rebuilt with the Chinese remainder theorem
+		
+		Parameter
+		---------
+		a : list
+			A list of rows of integers
+		workers : int, default = 1
+			If greater than 1, the primes are split between this many
+			processes
+		
+		Return
+		------
+		The determinant of a
+		
+		"""
+		if (not all(type(x) is int for row in a for x in row)):
+			raise ValueError("Modular determinants need integer entries")
+		# The square of Hadamard's bound
+		bound = 1
+		for row in a:
+			bound *= sum(x * x for x in row)
+		if (bound == 0):
+			return 0
+		primes = []
+		m = 1
+		p = 2 ** 62
+		tester = factorizer(memoryLimit = 0)
+		while (m * m <= 4 * bound):
+			p -= 1
+			while (not tester.isPrime(p)):
+				p -= 1
+			primes.append(p)
+			m *= p
+		if (workers > 1 and len(primes) > 1):
+			with ProcessPoolExecutor(max_workers = workers) as executor:
+				chunk = -(-len(primes) // workers)
+				residues = list(executor.map(partial(matrix.modularDetP, a), primes, chunksize = chunk))
+		else:
+			residues = [matrix.modularDetP(a, p) for p in primes]
+		d = 0
+		m = 1
+		for p, r in zip(primes, residues):
+			d += m * ((r - d) * pow(m, -1, p) % p)
+			m *= p
+		if (d > m // 2):
+			d -= m
+		return d
+	
+	@staticmethod
+	def modularDetP(a, p):
+		"""
+		
+		Compute an integer determinant modulo a prime p by elimination
+		
+		"""
+		a = [[x % p for x in row] for row in a]
+		n = len(a)
+		d = 1
+		for k in range(0, n):
+			i = k
+			while (i < n and a[i][k] == 0):
+				i += 1
+			if (i == n):
+				return 0
+			if (i != k):
+				a[k], a[i] = a[i], a[k]
+				d = -d
+			rowK = a[k]
+			d = d * rowK[k] % p
+			inverse = pow(rowK[k], -1, p)
+			tail = rowK[k + 1:]
+			for i in range(k + 1, n):
+				rowI = a[i]
+				f = rowI[k] * inverse % p
+				if (f != 0):
+					rowI[k + 1:] = [(x - f * y) % p for x, y in zip(rowI[k + 1:], tail)]
+		return d % p
+	
+	@staticmethod
+	def toExact(a):
+		"""
+		
+		Convert an int or rational entry to a Fraction for exact elimination
+		
+		"""
+		if (isType(a, rational)):
+			return Fraction(a.num, a.den)
+		return Fraction(a)
+	
+	@staticmethod
+	def fromExact(f):
+		"""
+		
+		Convert a Fraction back to an int or a rational
+		
+		"""
+		if (f.denominator == 1):
+			return f.numerator
+		return rational(f.numerator, f.denominator)
+	
+	@staticmethod
+	def multiply(a, b, method = "auto"):
+		"""
+		
+		Multiply two matrices given as lists of rows
+		
+		Parameters
+		----------
+		a : list
+			A list of rows
+		b : list
+			A list of rows, as many as a has columns
+		method : str, default = "auto"
+			"direct" multiplies each row by each column of the transposed b,
+			"strassen" uses Strassen's algorithm and "numpy" uses NumPy.
+			"auto" picks NumPy when it is installed and every entry fits a
+			64-bit integer or float product, Strassen's algorithm for large
+			matrices of exact entries and the direct product otherwise
+		
+		Return
+		------
+		The product as a list of rows
+		
+		"""
+		if (method == "auto"):
+			size = len(a) * len(b) * len(b[0])
+			if (numpy is not None and size >= numpyThreshold and matrix.numpyType(a, b) is not None):
+				method = "numpy"
+			elif (min(len(a), len(b), len(b[0])) > strassenThreshold and matrix.isExact(a) and matrix.isExact(b)):
+				method = "strassen"
+			else:
+				method = "direct"
+		if (method == "direct"):
+			return matrix.directProduct(a, b)
+		elif (method == "strassen"):
+			return matrix.strassen(a, b)
+		elif (method == "numpy"):
+			dtype = matrix.numpyType(a, b)
+			if (numpy is None or dtype is None):
+				raise ValueError("The entries cannot be multiplied with NumPy")
+			return numpy.dot(numpy.array(a, dtype = dtype), numpy.array(b, dtype = dtype)).tolist()
+		raise ValueError(f"Unknown multiplication method: {method}")
+	
+	@staticmethod
+	def directProduct(a, b):
+		"""
+		
+		Multiply two lists of rows, transposing b once so every entry of the
+		product is a single pass over a row and a column
+		
+		"""
+		columns = list(zip(*b))
+		return [[sum(map(mul, row, col)) for col in columns] for row in a]
+	
+	@staticmethod
+	def strassen(a, b):
+		"""
+		
+		Multiply two lists of rows with Strassen's algorithm
+		
+		Seven half-sized products replace eight at each level, padding odd
+		dimensions with a zero row or column, until the matrices are no
+		larger than strassenThreshold
+		
+		"""
+		n = len(a)
+		k = len(b)
+		m = len(b[0])
+		if (min(n, k, m) <= strassenThreshold):
+			return matrix.directProduct(a, b)
+		# Pad every dimension to an even size
+		if (n % 2 == 1 or k % 2 == 1):
+			a = [row + [0] * (k % 2) for row in a] + [[0] * (k + k % 2)] * (n % 2)
+		if (k % 2 == 1 or m % 2 == 1):
+			b = [row + [0] * (m % 2) for row in b] + [[0] * (m + m % 2)] * (k % 2)
+		h = (n + n % 2) // 2
+		l = (k + k % 2) // 2
+		w = (m + m % 2) // 2
+		a11 = [row[:l] for row in a[:h]]
+		a12 = [row[l:] for row in a[:h]]
+		a21 = [row[:l] for row in a[h:]]
+		a22 = [row[l:] for row in a[h:]]
+		b11 = [row[:w] for row in b[:l]]
+		b12 = [row[w:] for row in b[:l]]
+		b21 = [row[:w] for row in b[l:]]
+		b22 = [row[w:] for row in b[l:]]
+		add = lambda x, y: [[p + q for p, q in zip(u, v)] for u, v in zip(x, y)]
+		sub = lambda x, y: [[p - q for p, q in zip(u, v)] for u, v in zip(x, y)]
+		m1 = matrix.strassen(add(a11, a22), add(b11, b22))
+		m2 = matrix.strassen(add(a21, a22), b11)
+		m3 = matrix.strassen(a11, sub(b12, b22))
+		m4 = matrix.strassen(a22, sub(b21, b11))
+		m5 = matrix.strassen(add(a11, a12), b22)
+		m6 = matrix.strassen(sub(a21, a11), add(b11, b12))
+		m7 = matrix.strassen(sub(a12, a22), add(b21, b22))
+		c11 = add(sub(add(m1, m4), m5), m7)
+		c12 = add(m3, m5)
+		c21 = add(m2, m4)
+		c22 = add(add(sub(m1, m2), m3), m6)
+		# Reassemble and drop the padding
+		return [(c11[i] + c12[i])[:m] for i in range(0, h)][:n] + [(c21[i] + c22[i])[:m] for i in range(0, h)][:n - h]
+	
+	@staticmethod
+	def isExact(a):
+		# True if every entry is an integer, rational or Fraction
+		return all(isType(x, int, rational, Fraction) for row in a for x in row)
+	
+	@staticmethod
+	def numpyType(a, b):
+		"""
+		
+		Find a NumPy type that holds the product of a and b exactly
+		
+		Return
+		------
+		"int64" if every entry is an integer and no sum of products can
+		overflow, "float64" if every entry is a float or an integer that a
+		float holds exactly (with at least one float), or None
+		
+		"""
+		entries = [x for row in a for x in row] + [x for row in b for x in row]
+		if (all(type(x) is int for x in entries)):
+			bound = len(b) * max(abs(x) for row in a for x in row) * max(abs(x) for row in b for x in row)
+			return "int64" if (bound < 2 ** 63) else None
+		if (all(type(x) is float or (type(x) is int and abs(x) < 2 ** 53) for x in entries)):
+			return "float64"
+		return None
 	
 	@staticmethod
 	def identity(n):
@@ -222,14 +618,144 @@ class matrix:
 		"""
 		return matrix([[func(i, j) for j in range(1, n + 1)] for i in range(1, m + 1)])
 
-def det(m):
-	return m.det()
+class luDecomposition:
+	
+	def __init__(self, m):
+		"""
+		
+		Factor a square matrix as PA = LU using partial pivoting
+		
+		Integer and rational matrices are factored exactly, anything with a
+		float entry is factored in floating point.  The factorization takes
+		O(n^3) operations once, after which every solve costs O(n^2)
+		
+		Parameters
+		----------
+		m : matrix
+			A square matrix
+		
+		"""
+		if (not m.isSquare()):
+			raise ValueError("Only square matrices have LU decompositions")
+		self.n = m.nRows
+		self.exact = not any(isType(a, float) for row in m.values for a in row)
+		if (self.exact):
+			a = [[matrix.toExact(x) for x in row] for row in m.values]
+		else:
+			a = [[float(x) for x in row] for row in m.values]
+		# perm[i] is the row of m that ended up as row i
+		self.perm = list(range(0, self.n))
+		self.sign = 1
+		self.singular = False
+		for k in range(0, self.n):
+			p = max(range(k, self.n), key = lambda i: abs(a[i][k]))
+			if (a[p][k] == 0):
+				self.singular = True
+				continue
+			if (p != k):
+				a[k], a[p] = a[p], a[k]
+				self.perm[k], self.perm[p] = self.perm[p], self.perm[k]
+				self.sign = -self.sign
+			rowK = a[k]
+			pivot = rowK[k]
+			for i in range(k + 1, self.n):
+				rowI = a[i]
+				factor = rowI[k] / pivot
+				rowI[k] = factor
+				if (factor != 0):
+					for j in range(k + 1, self.n):
+						rowI[j] -= factor * rowK[j]
+		# L (below the diagonal, with an implied unit diagonal) and U share a
+		self.lu = a
+	
+	def det(self):
+		"""
+		
+		Compute the determinant of the factored matrix
+		
+		"""
+		d = self.sign
+		for k in range(0, self.n):
+			d *= self.lu[k][k]
+		return self.convert(d)
+	
+	def inv(self):
+		"""
+		
+		Compute the inverse of the factored matrix
+		
+		"""
+		return self.solve(matrix.identity(self.n))
+	
+	def solve(self, b):
+		"""
+		
+		Solve the system Ax = b for the factored matrix A
+		
+		Parameters
+		----------
+		b : list or matrix
+			Either a list of n values or a matrix with n rows, each column of
+			which is a separate right hand side
+		
+		Return
+		------
+		A list x with Ax = b if b is a list, otherwise a matrix X with AX = b
+		
+		"""
+		if (self.singular):
+			raise ValueError("Tried to invert a non-invertible matrix")
+		if (isType(b, matrix)):
+			if (b.nRows != self.n):
+				raise ValueError("Incorrect dimensions")
+			cols = [self.solveVector(b.getColumn(j)) for j in range(1, b.nCols + 1)]
+			return matrix([[col[i] for col in cols] for i in range(0, self.n)])
+		if (len(b) != self.n):
+			raise ValueError("Incorrect dimensions")
+		return self.solveVector(b)
+	
+	"""
+	
+	Internal methods
+	
+	"""
+	
+	def convert(self, x):
+		if (isType(x, Fraction)):
+			return matrix.fromExact(x)
+		return x
+	
+	def solveVector(self, b):
+		n = self.n
+		a = self.lu
+		if (self.exact):
+			y = [matrix.toExact(b[p]) if isType(b[p], int, rational) else b[p] for p in self.perm]
+		else:
+			y = [float(b[p]) for p in self.perm]
+		# Forward substitution with the unit lower triangle
+		for i in range(1, n):
+			rowI = a[i]
+			t = y[i]
+			for j in range(0, i):
+				t -= rowI[j] * y[j]
+			y[i] = t
+		# Back substitution with the upper triangle
+		for i in range(n - 1, -1, -1):
+			rowI = a[i]
+			t = y[i]
+			for j in range(i + 1, n):
+				t -= rowI[j] * y[j]
+			y[i] = t / rowI[i]
+		return [self.convert(x) for x in y]
+
+def det(m, method = None, workers = 1):
+	return m.det(method, workers)
 
 def adjoint(m):
 	return m.adjoint()
 
 def transpose(m):
-	m.transpose()
+	return m.transpose()
 
 def isSquare(m):
 	return m.isSquare()
\ No newline at end of file
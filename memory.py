@@ -1,36 +1,145 @@
+from collections import OrderedDict
+
 class memory:
-	
-	def __init__(self, dict, memoryLimit = 50):
-		self.keys = list(dict.keys())
-		self.values = list(dict.values())
+
+	"""
+
+	Create a memory object
+
+	A least recently used cache backed by an ordered hash map, so lookups,
+	insertions and moves to the front all take constant time
+
+	Parameters
+	----------
+	dict : dict
+		The initial contents of the memory, most recently used first
+	memoryLimit : int, default = 50
+		The maximum number of entries to keep before evicting the least
+		recently used one
+	store : store, default = None
+		A persistent store behind the memory.  Lookups that miss the memory
+		fall back to the store, and every insertion is written through to it
+
+	"""
+	def __init__(self, dict, memoryLimit = 50, store = None):
+		# Most recently used entries live at the end of the ordered map
+		self.data = OrderedDict()
 		self.memoryLimit = memoryLimit
-	
+		self.store = store
+		# Lookups that found their key
+		self.hits = 0
+		# Lookups that did not find their key
+		self.misses = 0
+		# Entries dropped to stay under memoryLimit
+		self.evictions = 0
+		# Lookups that missed the memory but were found in the store
+		self.storeHits = 0
+		for key in reversed(list(dict.keys())):
+			self[key] = dict[key]
+
+	def __contains__(self, key):
+		return key in self.data or (self.store is not None and key in self.store)
+
 	def __len__(self):
-		return len(self.keys)
-	
+		return len(self.data)
+
 	def __getitem__(self, key):
-		for i in range(0, len(self)):
-			if (self.keys[i] == key):
-				return self.values[i]
-		raise KeyError()
-	
+		try:
+			value = self.data[key]
+		except KeyError:
+			if (self.store is None):
+				self.misses += 1
+				raise KeyError(key)
+			try:
+				value = self.store[key]
+			except KeyError:
+				self.misses += 1
+				raise KeyError(key)
+			self.storeHits += 1
+			self.remember(key, value)
+			self.hits += 1
+			return value
+		self.data.move_to_end(key)
+		self.hits += 1
+		return value
+
 	def __setitem__(self, key, value):
-		i = 0
-		while (i < len(self.keys) and key != self.keys[i]):
-			i += 1
-		if (i >= len(self.keys)):
-			self.keys = [key] + self.keys[:(min(len(self), self.memoryLimit) - 1)]
-			self.values = [value] + self.values[:(min(len(self), self.memoryLimit) - 1)]
-		else:
-			self.keys = [key] + self.keys[:i] + self.keys[(i + 1):]
-			self.values = [value] + self.values[:i] + self.values[(i + 1):]
-	
+		self.remember(key, value)
+		if (self.store is not None):
+			self.store[key] = value
+
 	def clear(self):
-		self.keys.clear()
-		self.values.clear()
-	
+		# The store is shared with other processes, so it is left alone
+		self.data.clear()
+
 	def keys(self):
-		return self.keys
-	
+		return list(reversed(self.data.keys()))
+
 	def values(self):
-		return self.values
\ No newline at end of file
+		return list(reversed(self.data.values()))
+
+	def remember(self, key, value):
+		"""
+
+		An internal function to add an entry to the memory only, evicting the
+		least recently used entries to stay under memoryLimit
+
+		"""
+		if (key in self.data):
+			self.data.move_to_end(key)
+		self.data[key] = value
+		while (len(self.data) > self.memoryLimit):
+			self.data.popitem(last = False)
+			self.evictions += 1
+
+	def update(self, items):
+		"""
+
+		Add many entries at once, writing them to the store (if any) in a
+		single transaction
+
+		Parameters
+		----------
+		items : iterable
+			Any number of (key, value) tuples
+
+		"""
+		items = list(items)
+		for key, value in items:
+			self.remember(key, value)
+		if (self.store is not None):
+			self.store.update(items)
+
+	def resetStats(self):
+		"""
+
+		Reset the hit, miss and eviction counters to zero
+
+		"""
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.storeHits = 0
+
+	def stats(self):
+		"""
+
+		Report how well the memory is performing
+
+		Return
+		------
+		A dictionary with the hit, miss and eviction counts, the number of
+		hits served by the store, the hit rate and the current size and limit
+		of the memory
+
+		"""
+		lookups = self.hits + self.misses
+		return {
+			'hits': self.hits,
+			'misses': self.misses,
+			'evictions': self.evictions,
+			'storeHits': self.storeHits,
+			'hitRate': (self.hits / lookups) if (lookups > 0) else 0.0,
+			'size': len(self),
+			'memoryLimit': self.memoryLimit
+			}
\ No newline at end of file
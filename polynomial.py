@@ -1,5 +1,15 @@
 from .checkErrors import isType
+from array import array
 from copy import copy
+from . import dense
+from . import sparse
+from .memory import memory
+from .rational import rational
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
 
 class polynomial:
 
@@ -37,7 +47,7 @@ class polynomial:
 		elif (nArgs == 1):
 			if (isType(args[0], str)):
 				self.setPoly(polynomial.fromString(args[0], var = var, **kwargs))
-			elif (isType(args[0], int, float)):
+			elif (polynomial.isNumType(args[0])):
 				self.constList = [args[0]]
 				self.powerList = [0]
 			else:
@@ -51,6 +61,11 @@ class polynomial:
 		self.var = var
 		self.pMod = pMod
 		self.nMod = nMod
+		if (pMod is not None or nMod is not None):
+			# Work in (Z/nModZ)[x] / (pMod), keeping coefficients reduced
+			r = self.reduce(self)
+			self.setPoly(r)
+			self.degree = r.degree
 	
 	"""
 	
@@ -67,16 +82,10 @@ class polynomial:
 		s = self.copy()
 		for const, power in p:
 			s.append([const, power])
-		return s
+		return self.withModuli(p, s)
 
 	def __call__(self, x):
-		if (polynomial.isNumType(x)):
-			t = 0
-		else:
-			t = polynomial(0, 0)
-		for const, power in self:
-			t += x ** power * const
-		return t
+		return self.hornerAt(self.hornerTerms(), x)
 
 	def __copy__(self):
 		p = polynomial(0)
@@ -85,6 +94,8 @@ class polynomial:
 		p.nTerms = self.nTerms
 		p.var = self.var
 		p.degree = self.degree
+		p.pMod = self.pMod
+		p.nMod = self.nMod
 		return p
 
 	def __contains__(self, term):
@@ -103,25 +114,27 @@ class polynomial:
 		return True
 
 	def __floordiv__(self, p):
-		if (isType(p, int, float)):
+		if (polynomial.isNumType(p)):
 			if (p == 0):
 				raise ZeroDivisionError("Cannot divide by zero")
-			for i in range(0, self.nTerms):
-				self[i][0] /= p
+			if (self.nMod is not None):
+				inverse = pow(p, -1, self.nMod)
+				terms = dict((power, const * inverse % self.nMod) for const, power in self)
+			else:
+				terms = dict((power, dense.divide(const, p)) for const, power in self)
+			return self.withModuli(None, polynomial.fromDict(terms, var = self.var), False)
 		elif (isType(p, polynomial)):
-			if (self.degree < p.degree):
-				return polynomial(0)
-			# self.degree >= p.degree
-			a = copy(self)
-			b = p
-			t = polynomial(0)
-			while (a.degree >= b.degree):
-				aConst, aPower = a.getMaxTerm()
-				bConst, bPower = b.getMaxTerm()
-				d = polynomial(aConst / bConst, aPower - bPower)
-				t += d
-				a -= d * b
-			return t
+			q, r = self.divmodDense(p)
+			return self.withModuli(p, polynomial.fromDense(q, var = self.var), False)
+
+	def __divmod__(self, p):
+		if (not isType(p, polynomial)):
+			return self // p, self % p
+		# One division gives both the quotient and the remainder
+		q, r = self.divmodDense(p)
+		q = self.withModuli(p, polynomial.fromDense(q, var = self.var), False)
+		r = self.withModuli(p, polynomial.fromDense(r, var = self.var), False)
+		return q, r
 
 	def __getitem__(self, i):
 		return self.constList[i], self.powerList[i]
@@ -131,6 +144,12 @@ class polynomial:
 			p = polynomial(p)
 		for const, power in p:
 			self.append([const, power])
+		# Keep the result reduced by the moduli, as in the constructor
+		r = self.withModuli(p, self)
+		self.setPoly(r)
+		self.degree = r.degree
+		self.pMod = r.pMod
+		self.nMod = r.nMod
 		return self
 
 	def __imul__(self, p):
@@ -146,67 +165,63 @@ class polynomial:
 			p = polynomial(p)
 		for const, power in p:
 			self.append([-const, power])
+		# Keep the result reduced by the moduli, as in the constructor
+		r = self.withModuli(p, self)
+		self.setPoly(r)
+		self.degree = r.degree
+		self.pMod = r.pMod
+		self.nMod = r.nMod
 		return self
 
 	def __iter__(self):
-		self.i = 0
-		return self
+		return zip(self.constList, self.powerList)
 
 	def __len__(self):
 		return self.nTerms
 
 	def __mod__(self, m):
 		if (polynomial.isNumType(m)):
-			p = polynomial(0)
-			for const, power in self:
-				p.append([const % m, power])
+			p = polynomial.fromDict(dict((power, const % m) for const, power in self), var = self.var)
+			p.pMod = self.pMod
+			p.nMod = self.nMod
 			return p
 		elif (isType(m, polynomial)):
-			a = copy(self)
-			b = m
-			while (a.degree >= b.degree):
-				aConst, aPower = a.getMaxTerm()
-				bConst, bPower = b.getMaxTerm()
-				d = polynomial(aConst // bConst, aPower - bPower)
-				a -= b * d
-			return a
+			q, r = self.divmodDense(m)
+			return self.withModuli(m, polynomial.fromDense(r, var = self.var), False)
 
 	def __mul__(self, p):
-		if (polynomial.isNumType(p)):
-			p = polynomial(p, 0)
-		r = polynomial(0, 0)
-		for pConst, pPower in p:
-			for selfConst, selfPower in self:
-				r = r + polynomial(pConst * selfConst, pPower + selfPower)
-		r.simplify()
-		return r
+		return polynomial.mul(self, p)
 
 	def __ne__(self, p):
 		return not (self == p)
 
 	def __neg__(self):
-		n = polynomial(0, 0)
-		for const, power in self:
-			n = n + polynomial(-const, power)
-		return n
-
-	def __next__(self):
-		self.i += 1
-		if (self.i == len(self) + 1):
-			raise StopIteration
-		return self[self.i - 1]
+		n = copy(self)
+		n.constList = [-const for const in self.constList]
+		return self.withModuli(None, n)
 
 	def __pow__(self, p):
 		if (type(p) is not int or p < 0):
 			raise ArithmeticError("Polynomial objects can only be raised to positive integer powers")
+		if (self.pMod is not None):
+			# The modulus bounds the degree, so work on dense lists throughout
+			a = self.toDense(0)[0]
+			modulus = dense.getReducer(self.pMod.toDense(0)[0], self.nMod)
+			return self.reduce(polynomial.fromDense(dense.power(a, p, self.nMod, modulus), var = self.var))
+		if (self.isDense()):
+			a, low = self.toDense()
+			return self.reduce(polynomial.fromDense(dense.power(a, p, self.nMod), low * p, var = self.var))
 		r = polynomial(1, 0)
-		if (self.pMod != None):
-			for i in range(0, p):
-				r = ((r * self) % self.pMod) % self.nMod
-		for i in range(0, p):
-			r = r * self
+		b = self
+		# Square and multiply, reducing after every product
+		while (p > 0):
+			if (p & 1):
+				r = self.reduce(r * b)
+			p >>= 1
+			if (p > 0):
+				b = self.reduce(b * b)
 		r.simplify()
-		return r
+		return self.reduce(r)
 
 	def __radd__(self, p):
 		return self + p
@@ -244,7 +259,7 @@ class polynomial:
 		s = self.copy()
 		for const, power in p:
 			s.append([-const, power])
-		return s
+		return self.withModuli(p, s)
 	
 	"""
 	
@@ -368,106 +383,363 @@ class polynomial:
 
 	@staticmethod
 	def fromString(str, var = 'x', **kwargs):
-		numList = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']
-		opDict = {
-			'+': [0, lambda a, b: a + b],
-			'-': [0, lambda a, b: a - b],
-			'*': [1, lambda a, b: a * b],
-			'%': [1, lambda a, b: a % b],
-			'^': [2, lambda a, b: a ** b],
-			'(': [-1],
-			')': [-1]
-			}
-		values = []
-		ops = []
-		numChar = lambda c: c in numList or c == '.'
-		pars = 0
-		i = 0
-		valueLast = False
-		while i < len(str):
-			c = str[i]
-			# Do not check valueLast if one of these characters
-			if (c == ')'):
-				pars -= 1
-				if (pars < 0):
-					raise ValueError("Mismatched parentheses")
-				op = ops.pop()
-				while (op != '('):
-					values.append(opDict[op][1](values.pop(-2), values.pop()))
-					op = ops.pop()
-				valueLast = True
-				i += 1
-				continue
-			elif (c in opDict.keys() and opDict[c][0] >= 0):
-				opLast = True
-				while (len(ops) > 0 and opDict[c][0] <= opDict[ops[-1]][0]):
-					values.append(opDict[ops.pop()][1](values.pop(-2), values.pop()))
-				ops.append(c)
-				valueLast = False
-				i += 1
-				continue
-			elif (c == ' '):
-				i += 1
-				continue
-			# Deal with valueLast
-			if (valueLast):
-				while (len(ops) > 0 and 1 <= opDict[ops[-1]][0]):
-					values.append(opDict[ops.pop()][1](values.pop(-2), values.pop()))
-				ops.append('*')
-			# Proceed
-			if (numChar(c)):
-				num = ""
-				decimal = False
-				while (numChar(c) and i < len(str)):
-					if (c == '.'):
-						if (decimal):
-							raise ValueError("Two decimals detected")
-						decimal = True
-					num += c
-					i += 1
-					if (i < len(str)):
-						c = str[i]
-				i -= 1
-				if (decimal):
-					values.append(float(num))
-				else:
-					values.append(int(num))
-			elif (c in [x[0] for x in kwargs]):
-				arg = c
-				while (i < len(str) and arg not in kwargs and arg in [x[0:len(arg)] for x in kwargs]):
-					i += 1
-					arg += str[i]
-				if (arg in kwargs):
-					v = kwargs[arg]
-					if (not polynomial.isNumType(v)):
-						raise ValueError(f"Constant values must be numbers ({v} is not a number)")
-					values.append(kwargs[arg])
-				else:
-					raise ValueError(f"Unknown input ({arg})")
-			elif (c == var):
-				values.append(polynomial(1, 1))
-			elif (c == '('):
-				pars += 1
-				ops.append(c)
-				i += 1
-				valueLast = False
-				continue
-			else:
-				raise ValueError(f"Unknown character detected: {c}")
-			valueLast = True
-			i += 1
-		while (len(ops) > 0):
-			values.append(opDict[ops.pop()][1](values.pop(-2), values.pop()))
-		return values.pop()
-	
+		"""
+
+		Parse a string into the polynomial it describes
+
+		The string is compiled once (see compile) and the compiled expression
+		is bound to the given constants, so repeated parses of the same string
+		skip tokenizing entirely
+
+		Parameters
+		----------
+		str : string
+			The expression to parse
+		var : char, default = 'x'
+			The variable used in the expression
+		**kwargs : dictionary list
+			The values of any named constants in the expression
+
+		Return
+		------
+		The polynomial described by the string
+
+		"""
+		return polynomial.compile(str, var = var, names = kwargs.keys()).bind(**kwargs)
+
+	@staticmethod
+	def compile(str, var = 'x', names = ()):
+		"""
+
+		Compile a string into a reusable expression
+
+		Compiled expressions are kept in a bounded cache keyed by the string,
+		the variable and the constant names, so compiling the same string
+		again is a dictionary lookup
+
+		Parameters
+		----------
+		str : string
+			The expression to compile
+		var : char, default = 'x'
+			The variable used in the expression
+		names : iterable, default = ()
+			The names of the constants that may appear in the expression.
+			These decide how runs of letters are split into tokens
+
+		Return
+		------
+		An expression object which can be bound to constant values with
+		expression.bind
+
+		"""
+		names = tuple(sorted(names))
+		key = (str, var, names)
+		try:
+			return compiledExpressions[key]
+		except KeyError:
+			e = expression(str, var, names)
+			compiledExpressions[key] = e
+			return e
+
 	@staticmethod
 	def expMod(p, a, m):
-		t = polynomial(1)
-		for i in range(0, a):
-			t *= p
-			t = t % m
+		"""
+
+		Raise p to the power a modulo the polynomial m
+
+		Parameters
+		----------
+		p : polynomial
+			The base
+		a : int
+			A non-negative integer
+		m : polynomial
+			The modulus.  If p (or m) has an nMod, the computation is done
+			over the integers modulo nMod
+
+		Return
+		------
+		The remainder of p^a divided by m
+
+		"""
+		nMod = p.nMod if (p.nMod is not None) else m.nMod
+		modulus = dense.getReducer(m.toDense(0)[0], nMod)
+		# Square and multiply, reducing modulo m after every product
+		t = polynomial.fromDense(dense.power(p.toDense(0)[0], a, nMod, modulus), var = p.var)
+		t.pMod = p.pMod
+		t.nMod = nMod
+		return t
+
+	@staticmethod
+	def mul(a, b, method = "auto"):
+		"""
+
+		Multiply two polynomials with a chosen algorithm
+
+		Parameters
+		----------
+		a : polynomial
+			The first factor
+		b : polynomial or number
+			The second factor
+		method : str, default = "auto"
+			"schoolbook", "karatsuba" or "ntt" to multiply dense coefficient
+			vectors with that algorithm, "hash" or "heap" to multiply sorted
+			term lists with that algorithm (see sparse.multiply), "sparse" for
+			the best sparse algorithm or "auto" to choose from the sizes,
+			density and coefficient types.  The number-theoretic transform
+			needs integer coefficients
+
+		Return
+		------
+		The product of a and b
+
+		"""
+		if (polynomial.isNumType(b)):
+			b = polynomial(b, 0)
+		if (method == "auto" and not (a.isDense() and b.isDense())):
+			method = "sparse"
+		nMod = a.nMod if (a.nMod is not None) else b.nMod
+		if (method in ("sparse", "hash", "heap")):
+			x, xPowers = sparse.terms(a.constList, a.powerList)
+			y, yPowers = sparse.terms(b.constList, b.powerList)
+			r = sparse.multiply(x, xPowers, y, yPowers, nMod, "auto" if (method == "sparse") else method)
+			return a.withModuli(b, polynomial.fromTerms(*r, var = a.var))
+		x, xLow = a.toDense()
+		y, yLow = b.toDense()
+		r = dense.multiply(x, y, nMod, method)
+		return a.withModuli(b, polynomial.fromDense(r, xLow + yLow, var = a.var))
+
+	def evaluate(self, points):
+		"""
+
+		Evaluate the polynomial at many points with Horner's rule
+
+		Parameters
+		----------
+		points : list, array or numpy.ndarray
+			The points to evaluate at
+
+		Return
+		------
+		The values at each point.  A NumPy array gives a NumPy array computed
+		with vectorized operations, an array gives an array of the same type
+		code (or a list if the values do not fit it) and anything else gives
+		a list.  If the polynomial has an nMod, integer points and their
+		values are taken modulo nMod, except in NumPy arrays, whose
+		fixed-width integers could overflow
+
+		"""
+		terms = self.hornerTerms()
+		if (numpy is not None and isType(points, numpy.ndarray)):
+			return polynomial.horner(terms, points)
+		values = [self.hornerAt(terms, x) for x in points]
+		if (isType(points, array)):
+			typecode = 'd' if (points.typecode in 'fd' or any(isType(v, float) for v in values)) else points.typecode
+			try:
+				return array(typecode, values)
+			except (OverflowError, TypeError):
+				return values
+		return values
+
+	def evaluateMany(self, points):
+		"""
+
+		Evaluate the polynomial at many points with a remainder tree
+
+		Runs in O(M(n) log n) time for n points and a polynomial of degree
+		n, where M(n) is the cost of a multiplication, instead of the O(n^2)
+		of evaluating each point separately.  If the polynomial has an nMod,
+		points and values are taken modulo nMod
+
+		Parameters
+		----------
+		points : list
+			Integers, rationals or (with some rounding) floats
+
+		Return
+		------
+		A list of the values at each point
+
+		"""
+		a = self.toDense(0)[0]
+		if (self.nMod is not None):
+			points = [x % self.nMod for x in points]
+		return dense.evaluateMany(a, list(points), self.nMod)
+
+	@staticmethod
+	def interpolate(xs, ys, var = 'x', nMod = None):
+		"""
+
+		Find the polynomial of least degree through the points (xs[i], ys[i])
+
+		Uses subproduct trees, taking O(M(n) log n) time for n points
+
+		Parameters
+		----------
+		xs : list
+			Distinct integers, rationals or floats
+		ys : list
+			The values at those points
+		var : char, default = 'x'
+			The variable of the new polynomial
+		nMod : int, default = None
+			If given, interpolate over the integers modulo this prime
+
+		Return
+		------
+		The interpolating polynomial.  Over the integers its coefficients may
+		be rationals
+
+		"""
+		xs = list(xs)
+		ys = list(ys)
+		if (nMod is not None):
+			xs = [x % nMod for x in xs]
+			ys = [y % nMod for y in ys]
+		p = polynomial.fromDense(dense.interpolate(xs, ys, nMod), var = var)
+		p.nMod = nMod
+		return p
+
+	@staticmethod
+	def horner(terms, x):
+		"""
+
+		Evaluate a polynomial with Horner's rule
+
+		Gaps between exponents are bridged with a single power, so sparse
+		polynomials need one multiplication per term rather than one per degree
+
+		Parameters
+		----------
+		terms : list
+			The [const, power] terms of the polynomial in decreasing order of
+			power, as returned by hornerTerms
+		x : any type
+			The point to evaluate at.  Anything supporting + * and ** with an
+			integer works, including polynomials and NumPy arrays
+
+		Return
+		------
+		The value of the polynomial at x
+
+		"""
+		t = 0
+		last = terms[0][1]
+		for const, power in terms:
+			if (last - power == 1):
+				t = t * x + const
+			elif (last != power):
+				t = t * x ** (last - power) + const
+			else:
+				t = t + const
+			last = power
+		if (last != 0):
+			t = t * x ** last
 		return t
 
+	def hornerAt(self, terms, x):
+		# The value at x of the polynomial with the given hornerTerms, taken
+		# modulo nMod if there is one and x is an integer
+		if (self.nMod is not None and isType(x, int)):
+			return polynomial.horner(terms, x % self.nMod) % self.nMod
+		return polynomial.horner(terms, x)
+
+	def hornerTerms(self):
+		# The terms of the polynomial from highest to lowest power
+		return sorted(zip(self.constList, self.powerList), key = lambda term: term[1], reverse = True)
+
+	@staticmethod
+	def fromDense(coeffs, low = 0, var = 'x'):
+		"""
+
+		Create a polynomial from a dense coefficient list
+
+		Parameters
+		----------
+		coeffs : list
+			The coefficients, coeffs[i] being the coefficient of x^(i + low)
+		low : int, default = 0
+			The exponent of the first coefficient
+		var : char, default = 'x'
+			The variable of the new polynomial
+
+		Return
+		------
+		The polynomial with those coefficients.  The terms are built directly
+		(already simplified and ordered) rather than merged one at a time
+
+		"""
+		p = polynomial(0, var = var)
+		constList = []
+		powerList = []
+		for i in range(0, len(coeffs)):
+			if (coeffs[i] != 0):
+				constList.append(coeffs[i])
+				powerList.append(i + low)
+		if (len(constList) > 0):
+			p.constList = constList
+			p.powerList = powerList
+			p.nTerms = len(constList)
+			p.degree = powerList[-1]
+		return p
+
+	@staticmethod
+	def fromTerms(consts, powers, var = 'x'):
+		"""
+
+		Create a polynomial from terms in sparse form
+
+		Parameters
+		----------
+		consts : list
+			The nonzero coefficients
+		powers : list
+			The strictly increasing exponents matching consts
+		var : char, default = 'x'
+			The variable of the new polynomial
+
+		Return
+		------
+		The polynomial with those terms, which are used as they are
+
+		"""
+		p = polynomial(0, var = var)
+		if (len(powers) > 0):
+			p.constList = consts
+			p.powerList = powers
+			p.nTerms = len(powers)
+			p.degree = powers[-1]
+		return p
+
+	@staticmethod
+	def fromDict(terms, var = 'x'):
+		"""
+
+		Create a polynomial from a dictionary of terms
+
+		Parameters
+		----------
+		terms : dict
+			A dictionary mapping each exponent to its coefficient
+		var : char, default = 'x'
+			The variable of the new polynomial
+
+		Return
+		------
+		The polynomial with those terms, built directly in order of power
+
+		"""
+		p = polynomial(0, var = var)
+		powerList = sorted(power for power in terms if terms[power] != 0)
+		if (len(powerList) > 0):
+			p.constList = [terms[power] for power in powerList]
+			p.powerList = powerList
+			p.nTerms = len(powerList)
+			p.degree = powerList[-1]
+		return p
+
 	def getConstant(self, power):
 		i = 0
 		while (i < self.nTerms and self[i][1] != power):
@@ -480,12 +752,16 @@ class polynomial:
 	def getMaxTerm(self):
 		return max(self, key = lambda x: x[1])
 
+	def isDense(self):
+		# True if the terms fill enough of the exponent range to multiply densely
+		return self.nTerms >= dense.denseThreshold * (max(self.powerList) - min(self.powerList) + 1)
+
 	def isConstant(self):
 		return not self.nTerms > 1 and (self.nTerms == 0 or self[0][1] == 0)
 
 	@staticmethod
 	def isNumType(o):
-		return isType(o, int, float)
+		return isType(o, int, float, rational)
 
 	def order(self):
 		# only works on simplified polynomials
@@ -517,6 +793,64 @@ class polynomial:
 			self.nTerms = 1
 		return const, power
 
+	def divmodDense(self, m):
+		# Divide by the polynomial m, returning dense quotient and remainder
+		if (min(self.powerList) < 0 or min(m.powerList) < 0):
+			raise ValueError("Only polynomials with non-negative powers can be divided")
+		nMod = self.nMod if (self.nMod is not None) else m.nMod
+		return dense.fastDivmod(self.toDense(0)[0], m.toDense(0)[0], nMod)
+
+	def reduce(self, p):
+		# Reduce p by this polynomial's numeric and polynomial moduli, if any,
+		# and have it carry the same moduli
+		if (self.nMod is None and self.pMod is None):
+			return p
+		if (self.nMod is not None):
+			p = p % self.nMod
+		if (self.pMod is not None):
+			modulus = dense.getReducer(self.pMod.toDense(0)[0], self.nMod)
+			p = polynomial.fromDense(modulus.reduce(p.toDense(0)[0]), var = p.var)
+		p.pMod = self.pMod
+		p.nMod = self.nMod
+		return p
+
+	def withModuli(self, other, p, reduce = True):
+		# Give the result p of an operation between self and other the moduli
+		# of self (or of other if self has none), reducing p by them
+		source = self
+		if (self.nMod is None and self.pMod is None and isType(other, polynomial)):
+			source = other
+		if (reduce):
+			return source.reduce(p)
+		p.pMod = source.pMod
+		p.nMod = source.nMod
+		return p
+
+	def toDense(self, low = None):
+		"""
+
+		Convert the polynomial to a dense coefficient list
+
+		Parameters
+		----------
+		low : int, default = None
+			The exponent of the first coefficient, which must be at most the
+			lowest power present.  If None, the lowest power present is used
+
+		Return
+		------
+		A tuple (coeffs, low) where coeffs[i] is the coefficient of x^(i + low)
+
+		"""
+		if (low is None):
+			low = min(self.powerList)
+		elif (low > min(self.powerList)):
+			raise ValueError(f"The polynomial has powers below {low}")
+		coeffs = [0] * (max(self.powerList) - low + 1)
+		for const, power in self:
+			coeffs[power - low] += const
+		return coeffs, low
+
 	def removeZeros(self):
 		i = 0
 		while (i < self.nTerms):
@@ -532,3 +866,230 @@ class polynomial:
 		self.powerList = p.powerList
 		self.nTerms = p.nTerms
 		self.var = p.var
+
+class expression:
+
+	# Operator precedence, matching the order of operations in fromString
+	precedence = {'+': 0, '-': 0, '*': 1, '%': 1, '^': 2}
+
+	def __init__(self, str, var = 'x', names = ()):
+		"""
+
+		Compile a polynomial expression
+
+		The string is tokenized once into postfix order.  Numeric
+		subexpressions are folded at compile time and binding only walks the
+		postfix list, working on dictionaries of terms rather than polynomial
+		objects
+
+		Parameters
+		----------
+		str : string
+			The expression to compile
+		var : char, default = 'x'
+			The variable used in the expression
+		names : iterable, default = ()
+			The names of the constants that may appear in the expression
+
+		"""
+		self.str = str
+		self.var = var
+		self.names = tuple(names)
+		# A list of ('num', value), ('var', None), ('name', name) and
+		# ('op', symbol) tokens in postfix order
+		self.program = []
+		self.parse()
+
+	def __call__(self, **kwargs):
+		return self.bind(**kwargs)
+
+	def __repr__(self):
+		return f"<expression: {self.str}>"
+
+	def bind(self, **kwargs):
+		"""
+
+		Evaluate the compiled expression with the given constant values
+
+		Parameters
+		----------
+		**kwargs : dictionary list
+			The values of the named constants in the expression
+
+		Return
+		------
+		The polynomial the expression describes
+
+		"""
+		stack = []
+		for kind, value in self.program:
+			if (kind == 'num'):
+				stack.append({0: value})
+			elif (kind == 'var'):
+				stack.append({1: 1})
+			elif (kind == 'name'):
+				if (value not in kwargs):
+					raise ValueError(f"No value given for constant {value}")
+				v = kwargs[value]
+				if (not polynomial.isNumType(v)):
+					raise ValueError(f"Constant values must be numbers ({v} is not a number)")
+				stack.append({0: v})
+			else:
+				b = stack.pop()
+				stack.append(expression.apply(value, stack.pop(), b, self.var))
+		return polynomial.fromDict(stack.pop(), var = self.var)
+
+	"""
+
+	Internal methods
+
+	"""
+
+	def emit(self, op):
+		# Append an operator, folding it away if both operands are numbers
+		program = self.program
+		if (len(program) >= 2 and program[-1][0] == 'num' and program[-2][0] == 'num'):
+			b = program.pop()[1]
+			a = program.pop()[1]
+			terms = expression.apply(op, {0: a}, {0: b}, self.var)
+			if (len(terms) == 0):
+				program.append(('num', 0))
+			elif (list(terms.keys()) == [0]):
+				program.append(('num', terms[0]))
+			else:
+				program += [('num', a), ('num', b), ('op', op)]
+			return
+		program.append(('op', op))
+
+	def parse(self):
+		str = self.str
+		var = self.var
+		names = self.names
+		precedence = expression.precedence
+		numChar = lambda c: c.isdigit() or c == '.'
+		ops = []
+		pars = 0
+		i = 0
+		valueLast = False
+		while (i < len(str)):
+			c = str[i]
+			# Do not check valueLast if one of these characters
+			if (c == ')'):
+				pars -= 1
+				if (pars < 0):
+					raise ValueError("Mismatched parentheses")
+				op = ops.pop()
+				while (op != '('):
+					self.emit(op)
+					op = ops.pop()
+				valueLast = True
+				i += 1
+				continue
+			elif (c in precedence):
+				while (len(ops) > 0 and ops[-1] != '(' and precedence[c] <= precedence[ops[-1]]):
+					self.emit(ops.pop())
+				ops.append(c)
+				valueLast = False
+				i += 1
+				continue
+			elif (c == ' '):
+				i += 1
+				continue
+			# Deal with valueLast
+			if (valueLast):
+				while (len(ops) > 0 and ops[-1] != '(' and 1 <= precedence[ops[-1]]):
+					self.emit(ops.pop())
+				ops.append('*')
+			# Proceed
+			if (numChar(c)):
+				j = i
+				while (j < len(str) and numChar(str[j])):
+					j += 1
+				num = str[i:j]
+				if (num.count('.') > 1):
+					raise ValueError("Two decimals detected")
+				self.program.append(('num', float(num) if ('.' in num) else int(num)))
+				i = j - 1
+			elif (c in [x[0] for x in names]):
+				arg = c
+				while (i + 1 < len(str) and arg not in names and arg in [x[0:len(arg)] for x in names]):
+					i += 1
+					arg += str[i]
+				if (arg not in names):
+					raise ValueError(f"Unknown input ({arg})")
+				self.program.append(('name', arg))
+			elif (c == var):
+				self.program.append(('var', None))
+			elif (c == '('):
+				pars += 1
+				ops.append(c)
+				i += 1
+				valueLast = False
+				continue
+			else:
+				raise ValueError(f"Unknown character detected: {c}")
+			valueLast = True
+			i += 1
+		while (len(ops) > 0):
+			op = ops.pop()
+			if (op == '('):
+				raise ValueError("Mismatched parentheses")
+			self.emit(op)
+
+	@staticmethod
+	def apply(op, a, b, var):
+		# Apply an operator to two dictionaries of terms
+		if (op == '+' or op == '-'):
+			sign = 1 if (op == '+') else -1
+			r = dict(a)
+			for power in b:
+				r[power] = r.get(power, 0) + sign * b[power]
+				if (r[power] == 0):
+					del r[power]
+			return r
+		elif (op == '*'):
+			return expression.multiply(a, b)
+		elif (op == '^'):
+			if (list(b.keys()) not in ([], [0])):
+				raise ArithmeticError("Polynomial objects can only be raised to positive integer powers")
+			k = b.get(0, 0)
+			if (list(a.keys()) in ([], [0])):
+				return expression.clean({0: a.get(0, 0) ** k})
+			if (type(k) is not int or k < 0):
+				raise ArithmeticError("Polynomial objects can only be raised to positive integer powers")
+			r = {0: 1}
+			while (k > 0):
+				if (k & 1):
+					r = expression.multiply(r, a)
+				k >>= 1
+				if (k > 0):
+					a = expression.multiply(a, a)
+			return r
+		# op == '%'
+		if (list(b.keys()) in ([], [0])):
+			m = b.get(0, 0)
+			return expression.clean({power: a[power] % m for power in a})
+		r = polynomial.fromDict(a, var = var) % polynomial.fromDict(b, var = var)
+		return expression.clean(dict((power, const) for const, power in r))
+
+	@staticmethod
+	def clean(terms):
+		# Drop zero coefficients from a dictionary of terms
+		return dict((power, terms[power]) for power in terms if terms[power] != 0)
+
+	@staticmethod
+	def multiply(a, b):
+		# Multiply two dictionaries of terms
+		if (len(a) > dense.karatsubaThreshold and len(b) > dense.karatsubaThreshold):
+			r = polynomial.fromDict(a) * polynomial.fromDict(b)
+			return expression.clean(dict((power, const) for const, power in r))
+		r = {}
+		for aPower in a:
+			aConst = a[aPower]
+			for bPower in b:
+				power = aPower + bPower
+				r[power] = r.get(power, 0) + aConst * b[bPower]
+		return expression.clean(r)
+
+# The most recently compiled expressions, keyed by (string, variable, names)
+compiledExpressions = memory({}, memoryLimit = 256)
@@ -1,18 +1,23 @@
-from .factorizer import factorizer
+from fractions import Fraction
+from math import gcd
 
 class rational:
-	def __init__(self, num, den):
+
+	# Only the numerator and denominator are stored, keeping instances small
+	__slots__ = ('num', 'den')
+
+	def __init__(self, num, den = 1):
 		"""
-		
+
 		Create a new rational object
-		
+
 		Parameters
 		----------
 		num : int
 			An integer to use as the numerator
-		den : int
+		den : int, default = 1
 			An integer to use as the denominator
-		
+
 		"""
 		if (type(num) is not int):
 			raise TypeError("Numerator must be an integer")
@@ -20,45 +25,112 @@ class rational:
 			raise TypeError("Denominator must be an integer")
 		elif (den == 0):
 			raise ZeroDivisionError("Denominator cannot be 0")
-		self.num = num
-		self.den = den
-		self.f = factorizer()
-		self.simplify()
-	
+		if (den < 0):
+			num, den = -num, -den
+		d = gcd(num, den)
+		self.num = num // d
+		self.den = den // d
+
 	"""
-	
+
 	Magic methods
-	
+
 	"""
+	def __abs__(self):
+		return rational.reduced(abs(self.num), self.den)
+
 	def __add__(self, q):
-		try:
-			l = self.f.lcm(self.den, q.den)
-			a = self.num * l // self.den + q.num * l // q.den
-			if (a % l == 0):
-				return a // l
-			return rational(self.num * l // self.den + q.num * l // q.den, l)
-		except AttributeError:	
-			a = self.num + q * self.den
-			if (a % self.den == 0):
-				return a // self.den
-			return rational(a, q.den)
-	
+		if (type(q) is int):
+			return rational.reduced(self.num + q * self.den, self.den)
+		elif (type(q) is float):
+			return self() + q
+		elif (type(q) is not rational):
+			return NotImplemented
+		# Knuth's method keeps the intermediate numbers small and the result
+		# in lowest terms without a final gcd over the full product
+		d = gcd(self.den, q.den)
+		if (d == 1):
+			return rational.reduced(self.num * q.den + q.num * self.den, self.den * q.den)
+		t = self.num * (q.den // d) + q.num * (self.den // d)
+		e = gcd(t, d)
+		return rational.reduced(t // e, (self.den // d) * (q.den // e))
+
 	def __call__(self):
 		return self.num / self.den
-	
+
 	def __div__(self, q):
-		return rational(self.num * q.den, self.den * q.num)
-	
+		return self / q
+
+	def __eq__(self, q):
+		if (type(q) is rational):
+			return self.num == q.num and self.den == q.den
+		elif (type(q) is int):
+			return self.den == 1 and self.num == q
+		elif (type(q) is float):
+			return self() == q
+		return NotImplemented
+
+	def __float__(self):
+		return self.num / self.den
+
+	def __ge__(self, q):
+		if (type(q) is rational):
+			return self.num * q.den >= q.num * self.den
+		elif (type(q) is int):
+			return self.num >= q * self.den
+		elif (type(q) is float):
+			return self() >= q
+		return NotImplemented
+
+	def __gt__(self, q):
+		if (type(q) is rational):
+			return self.num * q.den > q.num * self.den
+		elif (type(q) is int):
+			return self.num > q * self.den
+		elif (type(q) is float):
+			return self() > q
+		return NotImplemented
+
+	def __hash__(self):
+		return hash(Fraction(self.num, self.den))
+
+	def __le__(self, q):
+		if (type(q) is rational):
+			return self.num * q.den <= q.num * self.den
+		elif (type(q) is int):
+			return self.num <= q * self.den
+		elif (type(q) is float):
+			return self() <= q
+		return NotImplemented
+
+	def __lt__(self, q):
+		if (type(q) is rational):
+			return self.num * q.den < q.num * self.den
+		elif (type(q) is int):
+			return self.num < q * self.den
+		elif (type(q) is float):
+			return self() < q
+		return NotImplemented
+
 	def __mul__(self, q):
-		a = self.num * q.num
-		b = self.den * q.den
-		if (a % b == 0):
-			return a // b
-		return rational(a, b)
-	
+		if (type(q) is int):
+			d = gcd(q, self.den)
+			return rational.reduced(self.num * (q // d), self.den // d)
+		elif (type(q) is float):
+			return self() * q
+		elif (type(q) is not rational):
+			return NotImplemented
+		# Cancelling across the product keeps the result in lowest terms
+		d = gcd(self.num, q.den)
+		e = gcd(q.num, self.den)
+		return rational.reduced((self.num // d) * (q.num // e), (self.den // e) * (q.den // d))
+
+	def __ne__(self, q):
+		return not self == q
+
 	def __neg__(self):
-		return rational(-self.num, self.den)
-	
+		return rational.reduced(-self.num, self.den)
+
 	def __pow__(self, q):
 		if (type(q) is float and q != 0):
 			if ((self.num ** q) ** (1 / q) != self.num):
@@ -68,81 +140,119 @@ class rational:
 			elif (q > 0):
 				return rational(int(self.num ** q), int(self.den ** q))
 			else:
-				return rational(int(self.den ** q), int(self.num ** q))
+				return rational(int(self.den ** -q), int(self.num ** -q))
 		elif (type(q) is rational):
 			return self ** q()
 		elif (type(q) is int):
 			if (q >= 0):
-				return rational(self.num ** q, self.den ** q)
-			elif (q < 0):
-				return rational(self.den ** q, self.num ** q)		
-	
+				return rational.reduced(self.num ** q, self.den ** q)
+			elif (self.num == 0):
+				raise ZeroDivisionError("Cannot raise 0 to a negative power")
+			num, den = self.den ** -q, self.num ** -q
+			if (den < 0):
+				num, den = -num, -den
+			return rational.reduced(num, den)
+
 	def __radd__(self, q):
-		return self + q
-	
+		return self.__add__(q)
+
+	def __repr__(self):
+		return f"rational({self.num}, {self.den})"
+
 	def __rmul__(self, q):
-		return self * q
-	
+		return self.__mul__(q)
+
 	def __rsub__(self, q):
-		try:
-			l = self.f.lcm(self.den, q.den)
-			a = -self.num * l // self.den + q.num * l // q.den
-			if (a % l == 0):
-				return a // l
-			return rational(-self.num * l // self.den + q.num * l // q.den, l)
-		except AttributeError:	
-			a = -self.num + q * self.den
-			if (a % self.den == 0):
-				return a // self.den
-			return rational(a, q.den)
-	
+		return -self + q
+
 	def __rtruediv__(self, q):
-		try:
-			a = self.den * q.num
-			b = self.num * q.den
-			if (a % b == 0):
-				return a // b
-			return rational(a, b)
-		except AttributeError:
-			return rational(self.num, self.den * q)
-	
+		if (self.num == 0):
+			raise ZeroDivisionError("Cannot divide by zero")
+		return self.inv() * q
+
 	def __str__(self):
 		return f"{self.num}/{self.den}"
-	
+
 	def __sub__(self, q):
-		try:
-			l = self.f.lcm(self.den, q.den)
-			a = self.num * l // self.den - q.num * l // q.den
-			if (a % l == 0):
-				return a // l
-			return rational(self.num * l // self.den - q.num * l // q.den, l)
-		except AttributeError:
-			a = self.num - q * self.den
-			if (a % self.den == 0):
-				return a // self.den
-			return rational(a, q.den)
-	
+		return self + -q
+
 	def __truediv__(self, q):
-		try:
-			a = self.num * q.den
-			b = self.den * q.num
-			if (a % b == 0):
-				return a // b
-			return rational(a, b)
-		except AttributeError:
-			return rational(self.num, self.den * q)
-	
+		if (type(q) is float):
+			return self() / q
+		elif (type(q) is not int and type(q) is not rational):
+			return NotImplemented
+		elif (q == 0):
+			raise ZeroDivisionError("Cannot divide by zero")
+		elif (type(q) is int):
+			return self * rational(1, q)
+		return self * q.inv()
+
 	"""
-	
+
 	Internal methods
-	
+
 	"""
-	
+
 	def inv(self):
-		return rational(self.den, self.num)
-	
+		if (self.num == 0):
+			raise ZeroDivisionError("Cannot invert zero")
+		if (self.num < 0):
+			return rational.reduced(-self.den, -self.num)
+		return rational.reduced(self.den, self.num)
+
 	def simplify(self):
-		d = self.f.gcd(self.num, self.den)
-		self.num = self.num // d
-		self.den = self.den // d
+		# Every rational is kept in lowest terms, so there is nothing to do
 		return self
+
+	@staticmethod
+	def reduced(num, den):
+		"""
+
+		Create a rational from a numerator and positive denominator that are
+		already known to be coprime, skipping the gcd
+
+		Return
+		------
+		The integer num if den is 1, otherwise the rational num/den
+
+		"""
+		if (den == 1):
+			return num
+		q = object.__new__(rational)
+		q.num = num
+		q.den = den
+		return q
+
+	@staticmethod
+	def sum(values):
+		"""
+
+		Add up many rationals and integers at once
+
+		The terms are accumulated over a single common denominator, which
+		only grows when a new denominator doesn't already divide it, and the
+		result is reduced once at the end
+
+		Parameters
+		----------
+		values : iterable
+			Any number of rationals and integers
+
+		Return
+		------
+		The sum of the values, as an integer if it is whole
+
+		"""
+		num = 0
+		den = 1
+		for q in values:
+			if (type(q) is int):
+				num += q * den
+				continue
+			if (den % q.den != 0):
+				m = q.den // gcd(den, q.den)
+				num *= m
+				den *= m
+			num += q.num * (den // q.den)
+		d = gcd(num, den)
+		return rational.reduced(num // d, den // d)
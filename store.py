@@ -0,0 +1,91 @@
+import json
+import sqlite3
+
+class store:
+
+	"""
+
+	Create a store object
+
+	A persistent key-value table in an SQLite database, used to keep entries
+	of a memory object across runs.  The database is opened in write-ahead
+	logging mode, so any number of processes can read it while others append
+	to it.  Keys and values are kept as JSON, so they must be made of
+	integers, strings and lists
+
+	Parameters
+	----------
+	path : str
+		The path of the database file, which is created if it doesn't exist
+	table : str, default = "memory"
+		The name of the table holding the entries, so that one file can back
+		several memories
+	timeout : float, default = 30
+		The number of seconds to wait for another process to finish writing
+
+	"""
+	def __init__(self, path, table = "memory", timeout = 30):
+		if (not table.isidentifier()):
+			raise ValueError(f"{table} is not a valid table name")
+		self.path = path
+		self.table = table
+		self.timeout = timeout
+		self.connection = sqlite3.connect(path, timeout = timeout, isolation_level = None)
+		# Readers never block the writer and commits skip the fsync of the
+		# main database file, which makes appending single entries cheap
+		self.connection.execute("PRAGMA journal_mode = WAL")
+		self.connection.execute("PRAGMA synchronous = NORMAL")
+		self.connection.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+	def __contains__(self, key):
+		row = self.connection.execute(f"SELECT 1 FROM {self.table} WHERE key = ?", (json.dumps(key),)).fetchone()
+		return row is not None
+
+	def __len__(self):
+		return self.connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+	def __getitem__(self, key):
+		row = self.connection.execute(f"SELECT value FROM {self.table} WHERE key = ?", (json.dumps(key),)).fetchone()
+		if (row is None):
+			raise KeyError(key)
+		return json.loads(row[0])
+
+	def __setitem__(self, key, value):
+		self.update([(key, value)])
+
+	def __getstate__(self):
+		# Connections cannot cross processes, so only the location is sent
+		return (self.path, self.table, self.timeout)
+
+	def __setstate__(self, state):
+		self.__init__(*state)
+
+	def __repr__(self):
+		return f"store({self.path!r}, table = {self.table!r})"
+
+	def clear(self):
+		self.connection.execute(f"DELETE FROM {self.table}")
+
+	def close(self):
+		self.connection.close()
+
+	def update(self, items):
+		"""
+
+		Add many entries to the store in a single transaction
+
+		An entry that is already present, possibly written by another
+		process, is left as it is
+
+		Parameters
+		----------
+		items : iterable
+			Any number of (key, value) tuples
+
+		"""
+		rows = [(json.dumps(key), json.dumps(value)) for key, value in items]
+		if (len(rows) == 0):
+			return
+		with self.connection:
+			self.connection.execute("BEGIN IMMEDIATE")
+			self.connection.executemany(f"INSERT OR IGNORE INTO {self.table} (key, value) VALUES (?, ?)", rows)
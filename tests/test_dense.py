@@ -0,0 +1,23 @@
+from random import Random
+from ..dense import longDivmod, newtonDivmod, nttMultiply, schoolbook
+
+def test_ntt_multiply():
+	rng = Random(14)
+	# Small coefficients need one prime, 40-bit ones several recombined with
+	# the CRT and 200-bit ones more than there are, so Karatsuba is used
+	for bits, p in ((10, None), (40, None), (200, None), (40, 998244353), (40, 10 ** 9 + 7)):
+		for n, m in ((1, 1), (1, 7), (33, 64), (100, 37)):
+			a = [rng.randrange(-2 ** bits, 2 ** bits) for i in range(n)]
+			b = [rng.randrange(-2 ** bits, 2 ** bits) for i in range(m)]
+			expected = schoolbook(a, b)
+			if (p is not None):
+				expected = [c % p for c in expected]
+			assert nttMultiply(a, b, p) == expected, (bits, p, n, m)
+
+def test_newton_divmod():
+	rng = Random(15)
+	for p in (None, 998244353):
+		for n, m in ((5, 5), (40, 3), (100, 60), (300, 150)):
+			a = [rng.randrange(-1000, 1000) for i in range(n)]
+			b = [rng.randrange(-1000, 1000) for i in range(m - 1)] + [rng.randrange(1, 1000)]
+			assert newtonDivmod(a, b, p) == longDivmod(a, b, p), (p, n, m)
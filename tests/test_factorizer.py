@@ -0,0 +1,39 @@
+from .. import factorizer
+
+def trialDivision(n):
+	# The prime factors of n, repeated by multiplicity, by naive trial division
+	factors = []
+	d = 2
+	while (d * d <= n):
+		while (n % d == 0):
+			factors.append(d)
+			n //= d
+		d += 1
+	if (n > 1):
+		factors.append(n)
+	return factors
+
+def test_is_prime():
+	f = factorizer()
+	for n in range(0, 20000):
+		assert f.isPrime(n) == (trialDivision(n) == [n]), n
+	# Strong pseudoprimes to the first few bases, and large primes
+	for n in (3215031751, 2152302898747, 3474749660383, 341550071728321, 3825123056546413051):
+		assert not f.isPrime(n), n
+	for n in (1000003, 998244353, 2147483647, 4294967291):
+		assert f.isPrime(n) == (trialDivision(n) == [n]), n
+
+def test_factor():
+	f = factorizer()
+	for n in range(1, 5000):
+		expected = trialDivision(n)
+		assert [[p, expected.count(p)] for p in sorted(set(expected))] == f.factor(n), n
+	# Products of primes too large for trial division, so Pollard rho does the work
+	primes = [998244353, 1000000007, 2147483647, 4294967291]
+	assert all(trialDivision(p) == [p] for p in primes)
+	for i in range(0, len(primes)):
+		for j in range(i, len(primes)):
+			p, q = primes[i], primes[j]
+			expected = [[p, 2]] if (p == q) else [[p, 1], [q, 1]]
+			assert f.factor(p * q) == expected, (p, q)
+	assert f.factor(1009 ** 3 * 998244353 * 2147483647) == [[1009, 3], [998244353, 1], [2147483647, 1]]
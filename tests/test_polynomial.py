@@ -0,0 +1,15 @@
+from .. import polynomial
+
+def test_in_place_moduli():
+	p = polynomial('3x', nMod = 7)
+	q = p
+	p += polynomial('5x')
+	assert q is p
+	assert p == polynomial('x', nMod = 7)
+	p -= polynomial('4x')
+	assert p == polynomial('4x', nMod = 7)
+
+def test_evaluate_moduli():
+	p = polynomial('x^2', nMod = 7)
+	assert p(3) == 2
+	assert p.evaluate([3, 10]) == [2, 2]
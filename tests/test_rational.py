@@ -0,0 +1,35 @@
+from .. import polynomial, rational
+
+def test_mixed_operands():
+	x = polynomial('x')
+	assert rational(1, 2) + x == x + rational(1, 2)
+	assert rational(1, 2) * x == polynomial([rational(1, 2)], [1])
+
+def test_compose_rational_coefficients():
+	# Horner's rule multiplies polynomial values by rational coefficients
+	p = polynomial('x^2 + 1') // 2
+	assert p(polynomial('x+1')) == polynomial([rational(1, 2), 1, 1], [2, 1, 0])
+	q = polynomial.interpolate([0, 1, 2], [0, 1, 3])
+	assert q(polynomial('x')) == q
+
+def test_inverse_of_zero():
+	try:
+		rational(0, 3).inv()
+	except ZeroDivisionError:
+		return
+	raise AssertionError("rational(0, 3).inv() did not raise")
+
+def test_mixed_comparisons():
+	half = rational(1, 2)
+	assert half > 0
+	assert not (1 < half)
+	assert half <= 1
+	assert half >= rational(1, 3)
+	assert min(half, 0.4) == 0.4
+	assert sorted([half, 0, 2]) == [0, half, 2]
+
+def test_negative_power():
+	assert rational(1, 2) ** -2 == 4
+	assert type(rational(1, 2) ** -2) is int
+	r = rational(-2, 3) ** -3
+	assert r.num == -27 and r.den == 8